@@ -0,0 +1,57 @@
+"""add article.cluster_id column for near-duplicate headline clusters
+
+Revision ID: 2026101802
+Revises: 2026101801
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026101802'
+down_revision = '2026101801'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    return bool(
+        conn.execute(
+            sa.text(
+                """
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_name = :table AND column_name = :column
+                """
+            ),
+            {"table": table, "column": column},
+        ).scalar()
+    )
+
+
+def upgrade() -> None:
+    # Idempotent add with explicit existence checks, as in 2025081101
+    conn = op.get_bind()
+
+    if not _has_column(conn, 'article', 'cluster_id'):
+        try:
+            conn.execute(sa.text("ALTER TABLE article ADD COLUMN cluster_id TEXT"))
+        except Exception:
+            # Ignore if concurrently added or other non-fatal race
+            pass
+
+    # Add to default partition if it exists and column is missing
+    try:
+        has_partition = conn.execute(
+            sa.text("SELECT to_regclass('public.article_default')")
+        ).scalar()
+        if has_partition and not _has_column(conn, 'article_default', 'cluster_id'):
+            conn.execute(sa.text("ALTER TABLE article_default ADD COLUMN cluster_id TEXT"))
+    except Exception:
+        # Ignore if partition lookup fails or permissions differ
+        pass
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE article DROP COLUMN IF EXISTS cluster_id")
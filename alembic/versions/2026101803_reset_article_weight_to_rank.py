@@ -0,0 +1,48 @@
+"""reset article.weight to the publisher rank
+
+Weights were stored as rank * recency decay, normalized within each fetch
+batch. Aggregation now applies the decay itself, so stored weights become
+the plain publisher rank, derived from article.provider.
+
+Revision ID: 2026101803
+Revises: 2026101802
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026101803'
+down_revision = '2026101802'
+branch_labels = None
+depends_on = None
+
+# Snapshot of services.aggregation.PUBLISHER_RANK / DEFAULT_RANK at this
+# revision; migrations must not change meaning when the app constants do.
+PUBLISHER_RANK = {
+    'Reuters': 1.0,
+    'Bloomberg': 0.9,
+    'CNBC': 0.8,
+}
+DEFAULT_RANK = 0.5
+
+
+def upgrade() -> None:
+    whens = " ".join(
+        f"WHEN :p{i} THEN :r{i}" for i in range(len(PUBLISHER_RANK))
+    )
+    params = {"default": DEFAULT_RANK}
+    for i, (provider, rank) in enumerate(PUBLISHER_RANK.items()):
+        params[f"p{i}"] = provider
+        params[f"r{i}"] = rank
+    # One statement on the parent updates every partition
+    op.get_bind().execute(
+        sa.text(f"UPDATE article SET weight = CASE provider {whens} ELSE :default END"),
+        params,
+    )
+
+
+def downgrade() -> None:
+    # The per-batch normalized weights cannot be reconstructed; ranks remain
+    pass
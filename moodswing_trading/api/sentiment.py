@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Path, HTTPException, WebSocket
 import asyncio
 from datetime import datetime
-from services.sentiment import SentimentService
+from services.sentiment import get_sentiment_service
 from models import SentimentRecord
 from utils.cache import get_json as cache_get_json, set_json as cache_set_json
 from core.ws_ratelimit import WsRateLimiter
@@ -11,7 +11,7 @@ router = APIRouter(
     tags=["sentiment"],
 )
 
-service = SentimentService()
+service = get_sentiment_service()
 
 @router.get("/{ticker}/{date}")
 async def get_sentiment(
@@ -24,6 +24,76 @@ class Settings(BaseSettings):
     result_backend: str | None = Field(None, alias="RESULT_BACKEND")
     tickers_env: str = Field("", alias="TICKERS")
     allowed_origins_env: str = Field("*", alias="ALLOWED_ORIGINS")
+    # Hourly news ingest: tickers collected concurrently and per-ticker timeout
+    news_ingest_concurrency: int = Field(8, alias="NEWS_INGEST_CONCURRENCY")
+    news_ingest_ticker_timeout: float = Field(120.0, alias="NEWS_INGEST_TICKER_TIMEOUT")
+    # Staged ingest pipeline: workers per stage after fetch (fetch uses
+    # NEWS_INGEST_CONCURRENCY) and jobs buffered in front of each stage
+    news_pipeline_normalize_concurrency: int = Field(2, alias="NEWS_PIPELINE_NORMALIZE_CONCURRENCY")
+    news_pipeline_score_concurrency: int = Field(1, alias="NEWS_PIPELINE_SCORE_CONCURRENCY")
+    news_pipeline_write_concurrency: int = Field(1, alias="NEWS_PIPELINE_WRITE_CONCURRENCY")
+    news_pipeline_queue_size: int = Field(32, alias="NEWS_PIPELINE_QUEUE_SIZE")
+    # Estimated Jaccard similarity at which headlines of one ticker-day join
+    # the same near-duplicate cluster; 0 disables clustering
+    news_dedupe_threshold: float = Field(0.6, alias="NEWS_DEDUPE_THRESHOLD")
+    # Running per-(ticker, day) sentiment aggregates in Redis, updated at
+    # ingest; the hourly refresh reads them and provisional scores are
+    # published right after each ingest batch
+    sentiment_accumulators: bool = Field(True, alias="SENTIMENT_ACCUMULATORS")
+    sentiment_accumulator_ttl_seconds: int = Field(
+        3 * 24 * 3600, alias="SENTIMENT_ACCUMULATOR_TTL_SECONDS"
+    )
+    # News sources queried concurrently: comma-separated provider names
+    # ("google", "local") with an optional per-provider timeout, e.g.
+    # "google,local:2"; NEWS_PROVIDER_TIMEOUT is the default timeout (s)
+    news_providers: str = Field("google", alias="NEWS_PROVIDERS")
+    news_provider_timeout: float = Field(30.0, alias="NEWS_PROVIDER_TIMEOUT")
+    # Directory of RSS/Atom files read by the "local" provider
+    news_local_dir: str = Field("./data/news", alias="NEWS_LOCAL_DIR")
+    # Google News HTTP transport: request timeout (s), retries with
+    # exponential backoff (base seconds) and pooled connection limit
+    news_http_timeout: float = Field(10.0, alias="NEWS_HTTP_TIMEOUT")
+    news_http_retries: int = Field(2, alias="NEWS_HTTP_RETRIES")
+    news_http_backoff: float = Field(0.5, alias="NEWS_HTTP_BACKOFF")
+    news_http_max_connections: int = Field(20, alias="NEWS_HTTP_MAX_CONNECTIONS")
+    # Conditional-GET feed cache TTL in Redis; 0 disables it
+    news_feed_cache_ttl_seconds: int = Field(24 * 3600, alias="NEWS_FEED_CACHE_TTL_SECONDS")
+    # Articles per multi-row INSERT ... ON CONFLICT statement
+    article_write_chunk_size: int = Field(500, alias="ARTICLE_WRITE_CHUNK_SIZE")
+    # Store only the feed entry fields ingest reads in the raw article payload
+    article_raw_json_compact: bool = Field(False, alias="ARTICLE_RAW_JSON_COMPACT")
+    # Sentiment inference: max headlines per forward pass and how long to
+    # wait for concurrent score() callers to fill a batch.
+    sentiment_batch_size: int = Field(32, alias="SENTIMENT_BATCH_SIZE")
+    sentiment_batch_wait_ms: float = Field(10.0, alias="SENTIMENT_BATCH_WAIT_MS")
+    # Token truncation length and headlines per length bucket; each bucket is
+    # padded only to its own longest member.
+    sentiment_max_tokens: int = Field(128, alias="SENTIMENT_MAX_TOKENS")
+    sentiment_bucket_size: int = Field(16, alias="SENTIMENT_BUCKET_SIZE")
+    # Headline score memo cache: in-process LRU entries and Redis TTL
+    sentiment_cache_size: int = Field(10000, alias="SENTIMENT_CACHE_SIZE")
+    sentiment_cache_ttl_seconds: int = Field(7 * 24 * 3600, alias="SENTIMENT_CACHE_TTL_SECONDS")
+    # Lexicon pre-pass: headlines at or above this confidence skip the
+    # transformer. Unset disables the lexicon tier.
+    sentiment_lexicon_threshold: float | None = Field(None, alias="SENTIMENT_LEXICON_THRESHOLD")
+    # Inference backend: "torch" (full precision), "onnx" (INT8 ONNX Runtime)
+    # or "remote" (client of a local sentiment inference server)
+    sentiment_backend: str = Field("torch", alias="SENTIMENT_BACKEND")
+    # ONNX Runtime intra-op threads per process; 0 lets ONNX Runtime decide
+    sentiment_onnx_threads: int = Field(0, alias="SENTIMENT_ONNX_THREADS")
+    sentiment_onnx_dir: str = Field(
+        str(Path.home() / ".cache" / "moodswing" / "onnx"), alias="SENTIMENT_ONNX_DIR"
+    )
+    # Local inference server: listen/connect address (unix:///path or
+    # tcp://host:port), the backend it serves and the client timeout
+    sentiment_server_url: str = Field(
+        "unix:///tmp/moodswing-sentiment.sock", alias="SENTIMENT_SERVER_URL"
+    )
+    sentiment_server_backend: str = Field("torch", alias="SENTIMENT_SERVER_BACKEND")
+    sentiment_server_timeout: float = Field(30.0, alias="SENTIMENT_SERVER_TIMEOUT")
+    # Load the sentiment model in the background at API startup instead of on
+    # the first request that needs inference.
+    sentiment_warmup: bool = Field(False, alias="SENTIMENT_WARMUP")
 
     @property
     def celery_broker(self) -> str:
@@ -0,0 +1,46 @@
+"""Compressed JSON payloads for large, rarely read columns.
+
+Payloads are zstd frames when ``zstandard`` is installed and zlib streams
+otherwise; :func:`unpack_json` tells them apart by their leading bytes, so
+rows written under either codec stay readable.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+def pack_json(value: Any) -> bytes:
+    """Serialize ``value`` as compact JSON and compress it."""
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def unpack_json(blob: bytes | None) -> Any:
+    """Inverse of :func:`pack_json`; ``None`` passes through."""
+    if blob is None:
+        return None
+    blob = bytes(blob)
+    if blob.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this payload")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return json.loads(data)
+
+
+__all__ = ["pack_json", "unpack_json"]
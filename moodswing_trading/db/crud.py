@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Mapping, Optional
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from core.config import get_settings
 from .models import SessionLocal, Article, SentimentDay, Prediction
 
 
@@ -21,9 +23,145 @@ def get_db() -> Generator[Session, None, None]:
 
 # --- Article Helpers -----------------------------------------------------
 
-def save_articles(db: Session, records: Iterable[Article]) -> None:
+def get_articles_by_ids(
+    db: Session, ticker: str, ids: Iterable[str], chunk_size: int = 1000
+) -> dict[str, Article]:
+    """Return the rows already stored for ``ticker`` among ``ids``, by id."""
+    ids = list(ids)
+    found: dict[str, Article] = {}
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i : i + chunk_size]
+        rows = (
+            db.query(Article)
+            .filter(Article.ticker == ticker, Article.id.in_(chunk))
+            .all()
+        )
+        found.update((r.id, r) for r in rows)
+    return found
+
+
+def get_article_clusters(
+    db: Session, ticker: str, start: datetime, end: datetime
+) -> List[tuple[str, str, int, Optional[str]]]:
+    """Return ``(id, headline, sentiment, cluster_id)`` rows published in
+    ``[start, end)`` for ``ticker``, oldest first."""
+    rows = (
+        db.query(Article.id, Article.headline, Article.sentiment, Article.cluster_id)
+        .filter(
+            Article.ticker == ticker,
+            Article.ts_pub >= start,
+            Article.ts_pub < end,
+        )
+        .order_by(Article.ts_pub)
+        .all()
+    )
+    return [tuple(r) for r in rows]
+
+
+def get_day_articles(
+    db: Session, ticker: str, start: datetime, end: datetime
+) -> List[Article]:
+    """Return ``ticker``'s articles published in ``[start, end)``."""
+    return (
+        db.query(Article)
+        .filter(
+            Article.ticker == ticker,
+            Article.ts_pub >= start,
+            Article.ts_pub < end,
+        )
+        .all()
+    )
+
+
+def count_articles(
+    db: Session, tickers: Iterable[str], start: datetime, end: datetime
+) -> dict[str, int]:
+    """Return the number of articles published in ``[start, end)`` per ticker."""
+    rows = (
+        db.query(Article.ticker, func.count())
+        .filter(
+            Article.ticker.in_(list(tickers)),
+            Article.ts_pub >= start,
+            Article.ts_pub < end,
+        )
+        .group_by(Article.ticker)
+        .all()
+    )
+    return {ticker: n for ticker, n in rows}
+
+
+def _upsert_insert(db: Session):
+    """Return the dialect ``insert`` construct supporting ON CONFLICT, if any."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _model_row(model, rec: Any) -> dict[str, Any]:
+    """Full column mapping for one ``model`` row, applying scalar column defaults."""
+    row = {}
+    for col in model.__table__.columns:
+        value = rec.get(col.name) if isinstance(rec, Mapping) else getattr(rec, col.name)
+        if value is None and col.default is not None and col.default.is_scalar:
+            value = col.default.arg
+        row[col.name] = value
+    return row
+
+
+def _bulk_upsert(db: Session, model, records: Iterable[Any], chunk_size: int) -> None:
+    """Insert or update ``records`` keyed on ``model``'s primary key.
+
+    Postgres and SQLite get one multi-row ``INSERT ... ON CONFLICT DO UPDATE``
+    per ``chunk_size`` rows; other dialects fall back to per-row merge. The
+    caller commits.
+    """
+    keys = [col.name for col in model.__table__.primary_key.columns]
+    # Last record wins for repeated keys, as with merge; a single ON CONFLICT
+    # statement may not touch the same row twice.
+    rows = {}
     for rec in records:
-        db.merge(rec)
+        row = _model_row(model, rec)
+        rows[tuple(row[k] for k in keys)] = row
+    if not rows:
+        return
+
+    insert = _upsert_insert(db)
+    if insert is None:
+        for row in rows.values():
+            db.merge(model(**row))
+        return
+
+    rows = list(rows.values())
+    for i in range(0, len(rows), chunk_size):
+        stmt = insert(model).values(rows[i : i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                col.name: stmt.excluded[col.name]
+                for col in model.__table__.columns
+                if not col.primary_key
+            },
+        )
+        db.execute(stmt)
+
+
+def save_articles(
+    db: Session,
+    records: Iterable[Article | Mapping[str, Any]],
+    chunk_size: int | None = None,
+) -> None:
+    """Insert or update ``records`` keyed on ``(id, ticker)``.
+
+    Postgres and SQLite get one multi-row ``INSERT ... ON CONFLICT DO UPDATE``
+    per ``chunk_size`` rows; other dialects fall back to per-row merge.
+    """
+    chunk_size = chunk_size or get_settings().article_write_chunk_size
+    _bulk_upsert(db, Article, records, chunk_size)
     db.commit()
 
 
@@ -37,6 +175,7 @@ def upsert_sentiment_day(
     article_cnt: int,
     explanation: str | None = None,
     is_final: bool = False,
+    provisional_ts: datetime | None = None,
 ) -> SentimentDay:
     obj = (
         db.query(SentimentDay)
@@ -48,6 +187,7 @@ def upsert_sentiment_day(
         obj.article_cnt = article_cnt
         obj.explanation = explanation
         obj.is_final = is_final
+        obj.provisional_ts = provisional_ts
     else:
         obj = SentimentDay(
             dt=dt,
@@ -56,12 +196,28 @@ def upsert_sentiment_day(
             article_cnt=article_cnt,
             explanation=explanation,
             is_final=is_final,
+            provisional_ts=provisional_ts,
         )
         db.add(obj)
     db.commit()
     return obj
 
 
+def upsert_sentiment_days(
+    db: Session,
+    records: Iterable[SentimentDay | Mapping[str, Any]],
+    chunk_size: int = 500,
+) -> None:
+    """Insert or update daily scores keyed on ``(dt, ticker)`` in one
+    transaction.
+
+    Each record carries the :class:`SentimentDay` columns; as with
+    :func:`upsert_sentiment_day`, omitted columns are reset rather than kept.
+    """
+    _bulk_upsert(db, SentimentDay, records, chunk_size)
+    db.commit()
+
+
 def get_sentiment_day(db: Session, dt: date, ticker: str) -> Optional[SentimentDay]:
     return (
         db.query(SentimentDay)
@@ -70,6 +226,21 @@ def get_sentiment_day(db: Session, dt: date, ticker: str) -> Optional[SentimentD
     )
 
 
+def get_sentiment_days(
+    db: Session, dt: date, tickers: Iterable[str]
+) -> dict[str, SentimentDay]:
+    """Return ``ticker -> SentimentDay`` for ``dt`` in one query."""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    rows = (
+        db.query(SentimentDay)
+        .filter(SentimentDay.dt == dt, SentimentDay.ticker.in_(tickers))
+        .all()
+    )
+    return {r.ticker: r for r in rows}
+
+
 def get_latest_sentiment_day(db: Session, ticker: str) -> Optional[SentimentDay]:
     return (
         db.query(SentimentDay)
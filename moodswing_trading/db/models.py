@@ -1,11 +1,13 @@
+import math
 import os
 from sqlalchemy import (
-    create_engine, Column, String, Text, Integer, Date, DateTime, Float,
-    Boolean, Numeric, JSON, Index
+    create_engine, event, Column, String, Text, Integer, Date, DateTime, Float,
+    Boolean, Numeric, JSON, Index, LargeBinary
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import declarative_base, deferred, sessionmaker
 
 from core.config import get_settings
+from .compression import unpack_json
 
 settings = get_settings()
 
@@ -15,6 +17,14 @@ if not DATABASE_URL or not DATABASE_URL.strip():
     DATABASE_URL = "sqlite:///./moodswing.db"
 
 engine = create_engine(DATABASE_URL, future=True)
+
+if engine.dialect.name == "sqlite":
+    # Aggregation decays weights with exp(), which Postgres has built in but
+    # SQLite only ships when compiled with its math functions
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_conn, _record) -> None:
+        dbapi_conn.create_function("exp", 1, math.exp, deterministic=True)
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 Base = declarative_base()
@@ -31,13 +41,25 @@ class Article(Base):
     provider = Column(String)
     url = Column(Text)
     weight = Column(Float, default=1.0)
-    raw_json = Column(JSON)
+    # Id of the first-seen article of this near-duplicate headline cluster
+    cluster_id = Column(String)
+    # Raw feed entry, never loaded by the hot read paths. New rows store it
+    # compressed in raw_zstd; raw_json only holds rows written before that.
+    raw_json = deferred(Column(JSON))
+    raw_zstd = deferred(Column(LargeBinary))
 
     __table_args__ = (
         Index("article_ts_idx", "ticker", "ts_pub"),
         {"postgresql_partition_by": "LIST (ticker)"},
     )
 
+    @property
+    def raw(self):
+        """Decoded raw feed entry, whichever column it is stored in."""
+        if self.raw_zstd is not None:
+            return unpack_json(self.raw_zstd)
+        return self.raw_json
+
 
 class SentimentDay(Base):
     __tablename__ = "sentiment_day"
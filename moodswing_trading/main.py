@@ -8,6 +8,7 @@ from fastapi.responses import PlainTextResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 import time
+import asyncio
 from models import ProblemDetails
 from core.logging import setup_logging
 from core.config import get_settings
@@ -17,6 +18,8 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 import uuid
 from db.models import engine
 from db.ensure_partitions import ensure_default_partitions
+from services.sentiment import get_sentiment_service
+from utils.cache import close_cache
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 
 setup_logging()
@@ -68,6 +71,14 @@ async def on_startup() -> None:
     except Exception:
         # Do not block startup; detailed errors will show up on first use if any
         pass
+    if settings.sentiment_warmup:
+        # Load the shared sentiment model off the request path; /healthz is
+        # served immediately either way.
+        app.state.sentiment_warmup = asyncio.create_task(get_sentiment_service().warm_up())
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await close_cache()
 
 app.include_router(market.router)
 app.include_router(news.router)
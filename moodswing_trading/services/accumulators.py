@@ -0,0 +1,299 @@
+"""Incrementally maintained per-day sentiment aggregates in Redis.
+
+Every ``(ticker, dt)`` keeps, under ``sentiment:acc:{TICKER}:{dt}``:
+
+* ``...:totals`` - hash of ``wsum`` (sum of sentiment x weight), ``wtotal``
+  (sum of weights) and ``count`` (articles written),
+* ``...:clusters`` - hash of ``cluster_id -> "weight:sentiment"`` for the
+  heaviest copy of each near-duplicate cluster seen so far,
+* ``...:top`` - sorted set of cluster ids by weight, trimmed to the top K,
+* ``...:headlines`` - hash of ``cluster_id -> headline`` for that top K,
+* ``...:ids`` - set of the article ids already counted.
+
+A Lua script applies each write atomically: a cluster contributes once, at
+its heaviest copy, matching :func:`services.aggregation.aggregate_day`, and
+an article already counted is skipped. The ingest pipeline updates the
+aggregates as articles are persisted and publishes provisional scores; the
+hourly refresh reads them instead of scanning the day's articles.
+
+A day's aggregates are seeded from its stored articles when they are first
+created, so totals are complete even when accumulation starts mid-day or
+after Redis lost the keys. A failed update deletes the day's keys instead of
+leaving them short.
+
+Recency decay depends on when the day is read, so weights are stored
+anchored to the start of the day, ``rank * exp(hours_since_midnight / tau)``,
+and scaled by ``exp(-hours_to_read_time / tau)`` in :meth:`read`. The factor
+is common to the whole day, so ordering and cluster choice are unaffected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from core.config import get_settings
+from db import crud
+from db.models import SessionLocal
+from utils.cache import get_cache
+from .aggregation import (
+    DECAY_TAU,
+    TOP_K,
+    DayAggregate,
+    day_score,
+    decay,
+    decay_time,
+    summarize,
+)
+
+logger = logging.getLogger(__name__)
+
+DayKey = Tuple[str, date]
+
+# KEYS: totals, clusters, top, headlines, ids
+# ARGV: ttl, top_k, then (id, cluster_id, weight, sentiment, headline) per article
+_ADD_SCRIPT = """
+local ttl, top_k = tonumber(ARGV[1]), tonumber(ARGV[2])
+for i = 3, #ARGV, 5 do
+  if redis.call('SADD', KEYS[5], ARGV[i]) == 1 then
+    local cluster, w, s = ARGV[i + 1], tonumber(ARGV[i + 2]), tonumber(ARGV[i + 3])
+    redis.call('HINCRBY', KEYS[1], 'count', 1)
+    local prev = redis.call('HGET', KEYS[2], cluster)
+    local pw, ps = 0, 0
+    if prev then
+      local sep = string.find(prev, ':', 1, true)
+      pw = tonumber(string.sub(prev, 1, sep - 1))
+      ps = tonumber(string.sub(prev, sep + 1))
+    end
+    if not prev or w > pw then
+      redis.call('HSET', KEYS[2], cluster, ARGV[i + 2] .. ':' .. ARGV[i + 3])
+      redis.call('HINCRBYFLOAT', KEYS[1], 'wsum', w * s - pw * ps)
+      redis.call('HINCRBYFLOAT', KEYS[1], 'wtotal', w - pw)
+      redis.call('ZADD', KEYS[3], w, cluster)
+      redis.call('HSET', KEYS[4], cluster, ARGV[i + 4])
+    end
+  end
+end
+local dropped = redis.call('ZRANGE', KEYS[3], 0, -(top_k + 1))
+if #dropped > 0 then
+  redis.call('ZREM', KEYS[3], unpack(dropped))
+  redis.call('HDEL', KEYS[4], unpack(dropped))
+end
+for _, key in ipairs(KEYS) do
+  redis.call('EXPIRE', key, ttl)
+end
+return 1
+"""
+
+
+def _prefix(ticker: str, dt: date) -> str:
+    return f"sentiment:acc:{ticker.upper()}:{dt.isoformat()}"
+
+
+def _utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def article_day(ts: datetime) -> date:
+    """UTC calendar day an article is aggregated under."""
+    return _utc(ts).date()
+
+
+def _day_start(dt: date) -> datetime:
+    return datetime.combine(dt, datetime.min.time())
+
+
+def _anchored_weight(rank: float | None, ts: datetime) -> float:
+    """``rank`` grown from the start of its day; see the module docstring."""
+    ts = _utc(ts)
+    hours = (ts - _day_start(ts.date())).total_seconds() / 3600
+    return (rank or 1.0) * math.exp(hours / DECAY_TAU)
+
+
+class SentimentAccumulators:
+    """Read and update per-``(ticker, dt)`` running aggregates."""
+
+    def __init__(self, ttl_seconds: int | None = None, top_k: int = TOP_K) -> None:
+        settings = get_settings()
+        self.ttl_seconds = ttl_seconds or settings.sentiment_accumulator_ttl_seconds
+        self.top_k = top_k
+
+    @staticmethod
+    def keys(ticker: str, dt: date) -> List[str]:
+        prefix = _prefix(ticker, dt)
+        parts = ("totals", "clusters", "top", "headlines", "ids")
+        return [f"{prefix}:{part}" for part in parts]
+
+    @staticmethod
+    def day_keys(records: Iterable) -> set[DayKey]:
+        """``(ticker, dt)`` aggregates the article rows belong to."""
+        return {(r.ticker.upper(), article_day(r.ts_pub)) for r in records}
+
+    @staticmethod
+    def _stored(keys: List[DayKey]) -> Dict[DayKey, list]:
+        with SessionLocal() as db:
+            return {
+                (ticker, dt): crud.get_day_articles(
+                    db, ticker, _day_start(dt), _day_start(dt) + timedelta(days=1)
+                )
+                for ticker, dt in keys
+            }
+
+    async def add(self, records: Iterable) -> set[DayKey]:
+        """Fold persisted article rows into their day aggregates.
+
+        Returns the ``(ticker, dt)`` keys touched. Ranks follow
+        ``aggregate_day``: a missing or zero rank counts as 1. A day without
+        aggregates yet is first seeded with all of its stored articles,
+        which include ``records``; articles already counted are skipped, so
+        concurrent seeding is harmless.
+        """
+        groups: Dict[DayKey, list] = defaultdict(list)
+        for r in records:
+            groups[(r.ticker.upper(), article_day(r.ts_pub))].append(r)
+        if not groups:
+            return set()
+        client = get_cache()
+        async with client.pipeline(transaction=False) as pipe:
+            for ticker, dt in groups:
+                pipe.exists(self.keys(ticker, dt)[0])
+            exists = await pipe.execute()
+        missing = [key for key, found in zip(groups, exists) if not found]
+        if missing:
+            stored = await asyncio.to_thread(self._stored, missing)
+            for key, rows in stored.items():
+                groups[key] = [*rows, *groups[key]]
+
+        script = client.register_script(_ADD_SCRIPT)
+        async with client.pipeline(transaction=False) as pipe:
+            for (ticker, dt), rows in groups.items():
+                args: List[str] = []
+                for r in rows:
+                    args.extend(
+                        [
+                            r.id,
+                            r.cluster_id or r.id,
+                            repr(_anchored_weight(r.weight, r.ts_pub)),
+                            str(int(r.sentiment)),
+                            r.headline or "",
+                        ]
+                    )
+                await script(
+                    keys=self.keys(ticker, dt),
+                    args=[self.ttl_seconds, self.top_k, *args],
+                    client=pipe,
+                )
+            await pipe.execute()
+        return set(groups)
+
+    async def discard(self, keys: Iterable[DayKey]) -> None:
+        """Drop aggregates that may be missing articles; the next update
+        reseeds them from the database."""
+        names = [name for ticker, dt in keys for name in self.keys(ticker, dt)]
+        if names:
+            await get_cache().delete(*names)
+
+    async def read(self, keys: Iterable[DayKey]) -> Dict[DayKey, DayAggregate]:
+        """Return the aggregates present in Redis for ``keys``, with weights
+        decayed to :func:`services.aggregation.decay_time` of each day."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        client = get_cache()
+        async with client.pipeline(transaction=False) as pipe:
+            for ticker, dt in keys:
+                totals, _, top, headlines, _ = self.keys(ticker, dt)
+                pipe.hgetall(totals)
+                pipe.zrevrange(top, 0, self.top_k - 1)
+                pipe.hgetall(headlines)
+            replies = await pipe.execute()
+
+        out: Dict[DayKey, DayAggregate] = {}
+        for i, (ticker, dt) in enumerate(keys):
+            totals, top, headlines = replies[3 * i : 3 * i + 3]
+            if not totals:
+                continue
+            totals = {k.decode(): float(v) for k, v in totals.items()}
+            headlines = {k.decode(): v.decode() for k, v in headlines.items()}
+            start = _day_start(dt)
+            scale = decay((decay_time(start) - start).total_seconds() / 3600)
+            out[(ticker, dt)] = DayAggregate(
+                ticker=ticker,
+                weighted_sum=totals.get("wsum", 0.0) * scale,
+                total_weight=totals.get("wtotal", 0.0) * scale,
+                article_cnt=int(totals.get("count", 0)),
+                top_headlines=[headlines[c.decode()] for c in top if c.decode() in headlines],
+            )
+        return out
+
+    async def publish_provisional(self, keys: Iterable[DayKey]) -> None:
+        """Store and publish provisional scores for today's touched keys.
+
+        Earlier days are left to the hourly refresh so a final score is
+        never overwritten. Aggregates whose article count disagrees with
+        the database are skipped and discarded, to be reseeded.
+        """
+        today = datetime.utcnow().date()
+        aggregates = await self.read(k for k in keys if k[1] == today)
+        aggregates = {k: a for k, a in aggregates.items() if a.total_weight}
+        if not aggregates:
+            return
+
+        stale: List[DayKey] = []
+
+        def _store() -> List[dict]:
+            now = datetime.now(timezone.utc)
+            tickers = [ticker for ticker, _ in aggregates]
+            start = _day_start(today)
+            rows = []
+            with SessionLocal() as db:
+                counts = crud.count_articles(db, tickers, start, start + timedelta(days=1))
+                yesterday = crud.get_sentiment_days(db, today - timedelta(days=1), tickers)
+                for (ticker, dt), agg in aggregates.items():
+                    if agg.article_cnt != counts.get(ticker):
+                        stale.append((ticker, dt))
+                        continue
+                    rows.append(
+                        {
+                            "dt": dt,
+                            "ticker": ticker,
+                            "score": day_score(agg, yesterday.get(ticker)),
+                            "article_cnt": agg.article_cnt,
+                            "explanation": summarize(agg.top_headlines),
+                            "is_final": False,
+                            "provisional_ts": now,
+                        }
+                    )
+                crud.upsert_sentiment_days(db, rows)
+            return [
+                {
+                    "ticker": row["ticker"],
+                    "date": row["dt"].isoformat(),
+                    "score": row["score"],
+                    "article_cnt": row["article_cnt"],
+                    "is_final": False,
+                    "explanation": row["explanation"],
+                    "provisional_ts": now.isoformat(),
+                }
+                for row in rows
+            ]
+
+        payloads = await asyncio.to_thread(_store)
+        if stale:
+            logger.warning("discarding %d incomplete sentiment accumulators", len(stale))
+            await self.discard(stale)
+        client = get_cache()
+        async with client.pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish("sentiment_day", json.dumps(payload))
+            await pipe.execute()
+
+
+__all__ = ["SentimentAccumulators", "article_day"]
@@ -0,0 +1,204 @@
+"""Daily sentiment aggregation over stored articles.
+
+:func:`aggregate_day` computes every ticker's weighted sentiment sums,
+article count and top-K headlines for one day in a single grouped query;
+window functions collapse near-duplicate clusters to their heaviest copy and
+rank headlines per ticker, so only ``top_k`` rows per ticker leave the
+database regardless of article volume.
+
+Articles store their publisher rank as ``weight``. Recency decay is applied
+here, relative to the aggregation time, so re-aggregating a day is
+deterministic and never rewrites article rows.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session
+
+from db.models import Article
+
+# Weight of today's score when blending with yesterday's final score
+BLEND_ALPHA = 0.6
+TOP_K = 5
+
+# Publisher popularity tiers mapped to rank factors in [0.1, 1.0]
+PUBLISHER_RANK = {
+    "Reuters": 1.0,
+    "Bloomberg": 0.9,
+    "CNBC": 0.8,
+}
+DEFAULT_RANK = 0.5
+
+# Recency decay constant in hours
+DECAY_TAU = 6.0
+
+
+@dataclass
+class DayAggregate:
+    """Weighted sentiment totals for one ticker and day."""
+
+    ticker: str
+    weighted_sum: float
+    total_weight: float
+    article_cnt: int
+    top_headlines: List[str] = field(default_factory=list)
+
+    @property
+    def raw_score(self) -> float:
+        """Weighted mean sentiment in [-1, 1]."""
+        return self.weighted_sum / self.total_weight
+
+
+def publisher_rank(source: str | None) -> float:
+    """Stored article weight for a publisher."""
+    return PUBLISHER_RANK.get(source, DEFAULT_RANK)
+
+
+def decay_time(day_start: datetime, now: datetime | None = None) -> datetime:
+    """Time a day's weights decay to: its close once over, else ``now``."""
+    now = now or datetime.utcnow()
+    return min(day_start + timedelta(days=1), now)
+
+
+def _utc_naive(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def decay(age_hours: float) -> float:
+    """Recency factor for an article ``age_hours`` old."""
+    return math.exp(-age_hours / DECAY_TAU)
+
+
+def mood_score(raw: float) -> float:
+    """Map a weighted mean sentiment in [-1, 1] to the 0-100 mood scale."""
+    return round((raw + 1) * 50, 1)
+
+
+def blend(today: float, yesterday: float, alpha: float = BLEND_ALPHA) -> float:
+    """Blend today's mood score with yesterday's final score."""
+    return round(alpha * today + (1 - alpha) * yesterday, 1)
+
+
+def day_score(agg: DayAggregate, yesterday=None) -> float:
+    """Today's mood score, blended with ``yesterday`` only if it is final."""
+    today = mood_score(agg.raw_score)
+    if yesterday is not None and yesterday.is_final:
+        return blend(today, yesterday.score)
+    return today
+
+
+def summarize(headlines: List[str]) -> str:
+    """Return a short summary of headlines (placeholder for LLM)."""
+    text = "; ".join(headlines)
+    return text[:120]
+
+
+def _age_hours(db: Session, as_of: datetime, ts):
+    """SQL expression for the hours between ``ts`` and ``as_of``."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", literal(as_of, ts.type) - ts) / 3600.0
+    # SQLite stores naive UTC text; julianday() counts days
+    return (func.julianday(as_of.isoformat(sep=" ")) - func.julianday(ts)) * 24.0
+
+
+def aggregate_day(
+    db: Session,
+    tickers: Sequence[str],
+    start: datetime,
+    end: datetime,
+    top_k: int = TOP_K,
+    as_of: datetime | None = None,
+) -> Dict[str, DayAggregate]:
+    """Aggregate articles published in ``[start, end)`` for ``tickers``.
+
+    Each article weighs its publisher rank (a missing or zero rank counts
+    as 1) decayed by its age at ``as_of``, which defaults to the earlier of
+    ``end`` and now. Each near-duplicate cluster counts once, at its
+    heaviest copy; ``article_cnt`` still counts every row. Tickers without
+    articles are absent from the result.
+    """
+    if not tickers:
+        return {}
+    as_of = _utc_naive(as_of) if as_of is not None else min(end, datetime.utcnow())
+    rank = func.coalesce(func.nullif(Article.weight, 0), 1.0)
+    weight = rank * func.exp(-_age_hours(db, as_of, Article.ts_pub) / DECAY_TAU)
+    cluster = func.coalesce(Article.cluster_id, Article.id)
+    ranked = (
+        select(
+            Article.ticker,
+            Article.id,
+            Article.headline,
+            Article.sentiment,
+            weight.label("w"),
+            func.row_number()
+            .over(partition_by=(Article.ticker, cluster), order_by=(weight.desc(), Article.id))
+            .label("cluster_rank"),
+            func.count().over(partition_by=Article.ticker).label("article_cnt"),
+        )
+        .where(
+            Article.ticker.in_(list(tickers)),
+            Article.ts_pub >= start,
+            Article.ts_pub < end,
+        )
+        .subquery()
+    )
+    reps = (
+        select(
+            ranked.c.ticker,
+            ranked.c.headline,
+            ranked.c.article_cnt,
+            func.row_number()
+            .over(partition_by=ranked.c.ticker, order_by=(ranked.c.w.desc(), ranked.c.id))
+            .label("top_rank"),
+            func.sum(ranked.c.sentiment * ranked.c.w)
+            .over(partition_by=ranked.c.ticker)
+            .label("weighted_sum"),
+            func.sum(ranked.c.w).over(partition_by=ranked.c.ticker).label("total_weight"),
+        )
+        .where(ranked.c.cluster_rank == 1)
+        .subquery()
+    )
+    stmt = (
+        select(reps)
+        .where(reps.c.top_rank <= top_k)
+        .order_by(reps.c.ticker, reps.c.top_rank)
+    )
+
+    out: Dict[str, DayAggregate] = {}
+    for row in db.execute(stmt):
+        agg = out.get(row.ticker)
+        if agg is None:
+            agg = out[row.ticker] = DayAggregate(
+                ticker=row.ticker,
+                weighted_sum=float(row.weighted_sum),
+                total_weight=float(row.total_weight),
+                article_cnt=int(row.article_cnt),
+            )
+        agg.top_headlines.append(row.headline)
+    return out
+
+
+__all__ = [
+    "BLEND_ALPHA",
+    "DECAY_TAU",
+    "DEFAULT_RANK",
+    "PUBLISHER_RANK",
+    "TOP_K",
+    "DayAggregate",
+    "aggregate_day",
+    "blend",
+    "day_score",
+    "decay",
+    "decay_time",
+    "mood_score",
+    "publisher_rank",
+    "summarize",
+]
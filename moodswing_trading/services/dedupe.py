@@ -0,0 +1,235 @@
+"""Near-duplicate headline clustering with MinHash and LSH.
+
+Syndicated stories reach the feed as many near-identical headlines from
+different publishers. Each ticker-day keeps a :class:`DedupeIndex` of
+MinHash signatures over character shingles; banded LSH finds candidate
+matches in O(1) per band and a union-find groups matches into clusters. A
+cluster is identified by the id of its first-seen member.
+
+Indexes live in-process. Every seeded lookup tops the index up with the
+day's stored articles it has not seen, so articles written by other worker
+processes (or before a restart) join the same clusters. Two processes
+ingesting the same story at the same moment can still open separate
+clusters until one of them reloads.
+"""
+
+from __future__ import annotations
+
+import threading
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import get_settings
+from .sentiment_cache import normalize_headline
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+# Days of indexes kept per process; the ingest look-back spans 7 days
+RETAIN_DAYS = 8
+
+_EMPTY = np.iinfo(np.uint64).max
+# One seed per permutation; each is mixed into the shingle hash by splitmix64
+_SEEDS = np.random.default_rng(0x5EED).integers(
+    0, _EMPTY, NUM_PERM, dtype=np.uint64, endpoint=True
+)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer; uint64 array arithmetic wraps silently."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingles(text: str) -> List[int]:
+    norm = normalize_headline(text)
+    if len(norm) <= SHINGLE_SIZE:
+        return [zlib.crc32(norm.encode())] if norm else []
+    return list(
+        {zlib.crc32(norm[i : i + SHINGLE_SIZE].encode()) for i in range(len(norm) - SHINGLE_SIZE + 1)}
+    )
+
+
+def minhash(texts: Sequence[str]) -> np.ndarray:
+    """Return a ``(len(texts), NUM_PERM)`` MinHash signature matrix.
+
+    Texts without shingles get an all-max signature that matches nothing.
+    """
+    sigs = np.full((len(texts), NUM_PERM), _EMPTY, dtype=np.uint64)
+    hashes: List[int] = []
+    offsets: List[int] = []
+    rows: List[int] = []
+    for row, text in enumerate(texts):
+        sh = _shingles(text)
+        if sh:
+            rows.append(row)
+            offsets.append(len(hashes))
+            hashes.extend(sh)
+    if hashes:
+        # (NUM_PERM, shingles) keeps each row's reduction contiguous
+        perm = _mix(_SEEDS[:, None] ^ np.asarray(hashes, dtype=np.uint64))
+        sigs[rows] = np.minimum.reduceat(perm, offsets, axis=1).T
+    return sigs
+
+
+class DedupeIndex:
+    """LSH index plus union-find over one ticker-day's headlines."""
+
+    def __init__(self, threshold: float, bands: int = BANDS) -> None:
+        if NUM_PERM % bands:
+            raise ValueError("bands must divide NUM_PERM")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.lock = threading.Lock()
+        self._ids: List[str] = []
+        self._pos: Dict[str, int] = {}
+        self._parent: List[int] = []
+        self._sigs = np.empty((64, NUM_PERM), dtype=np.uint64)
+        self._sentiment: List[Optional[int]] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, i: int, j: int) -> None:
+        ri, rj = self._find(i), self._find(j)
+        if ri != rj:
+            # The earliest member stays the representative
+            lo, hi = min(ri, rj), max(ri, rj)
+            self._parent[hi] = lo
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        sentiments: Optional[Sequence[Optional[int]]] = None,
+        clusters: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[str]:
+        """Index ``texts`` and return each one's cluster id.
+
+        ``clusters`` pins items to an existing cluster (used when seeding
+        from stored rows); ids already in the index keep their cluster.
+        """
+        sigs = minhash(texts)
+        out: List[str] = []
+        for k, (art_id, sig) in enumerate(zip(ids, sigs)):
+            if art_id in self._pos:
+                out.append(self._ids[self._find(self._pos[art_id])])
+                continue
+            i = len(self._ids)
+            self._ids.append(art_id)
+            self._pos[art_id] = i
+            self._parent.append(i)
+            if i == len(self._sigs):
+                self._sigs = np.concatenate([self._sigs, np.empty_like(self._sigs)])
+            self._sigs[i] = sig
+            self._sentiment.append(sentiments[k] if sentiments is not None else None)
+
+            pinned = clusters[k] if clusters is not None else None
+            if pinned is not None and pinned in self._pos:
+                self._union(i, self._pos[pinned])
+            elif sig[0] != _EMPTY:
+                candidates = np.fromiter(self._candidates(sig), dtype=np.intp)
+                if candidates.size:
+                    agree = (self._sigs[candidates] == sig).sum(axis=1)
+                    for j in candidates[agree >= self.threshold * NUM_PERM]:
+                        self._union(i, int(j))
+            if sig[0] != _EMPTY:
+                for band in range(self.bands):
+                    key = (band, sig[band * self.rows : (band + 1) * self.rows].tobytes())
+                    self._buckets[key].append(i)
+            out.append(self._ids[self._find(i)])
+        return out
+
+    def load(self, rows: Sequence[tuple]) -> None:
+        """Index stored ``(id, headline, sentiment, cluster_id)`` rows not yet
+        present; known rows only pick up a sentiment scored elsewhere."""
+        fresh = []
+        for row in rows:
+            pos = self._pos.get(row[0])
+            if pos is None:
+                fresh.append(row)
+            elif row[2] is not None and self._sentiment[pos] is None:
+                self._sentiment[pos] = row[2]
+        if fresh:
+            # Representatives first, so members can be pinned to them
+            fresh.sort(key=lambda r: r[3] not in (None, r[0]))
+            ids, texts, sentiments, clusters = zip(*fresh)
+            self.add(ids, texts, sentiments, clusters)
+
+    def _candidates(self, sig: np.ndarray) -> set[int]:
+        found: set[int] = set()
+        for band in range(self.bands):
+            key = (band, sig[band * self.rows : (band + 1) * self.rows].tobytes())
+            found.update(self._buckets.get(key, ()))
+        return found
+
+    def sentiment(self, cluster_id: str) -> Optional[int]:
+        """Stored sentiment of the cluster's representative, if known."""
+        pos = self._pos.get(cluster_id)
+        return self._sentiment[pos] if pos is not None else None
+
+    def set_sentiment(self, art_id: str, sentiment: int) -> None:
+        pos = self._pos.get(art_id)
+        if pos is not None:
+            self._sentiment[pos] = sentiment
+
+
+class DedupeRegistry:
+    """Per-process ``(ticker, day) -> DedupeIndex`` map with old-day eviction."""
+
+    def __init__(self, threshold: float | None = None) -> None:
+        settings = get_settings()
+        self.threshold = settings.news_dedupe_threshold if threshold is None else threshold
+        self._indexes: Dict[Tuple[str, date], DedupeIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, ticker: str, day: date, seed=None) -> DedupeIndex:
+        """Return the index for ``ticker`` on ``day``.
+
+        ``seed(ticker, day)`` returns the day's stored ``(id, headline,
+        sentiment, cluster_id)`` rows in publication order; rows the index
+        has not seen yet are added on every call that passes it.
+        """
+        key = (ticker.upper(), day)
+        with self._lock:
+            index = self._indexes.get(key)
+            created = index is None
+            if created:
+                cutoff = datetime.utcnow().date() - timedelta(days=RETAIN_DAYS)
+                for old in [k for k in self._indexes if k[1] < cutoff]:
+                    del self._indexes[old]
+                index = self._indexes[key] = DedupeIndex(self.threshold)
+                # Seed under the index lock so concurrent callers wait for it
+                index.lock.acquire()
+        if seed is None:
+            if created:
+                index.lock.release()
+            return index
+        if not created:
+            index.lock.acquire()
+        try:
+            index.load(seed(key[0], day))
+        except Exception:
+            if created:
+                with self._lock:
+                    self._indexes.pop(key, None)
+            raise
+        finally:
+            index.lock.release()
+        return index
+
+
+__all__ = ["DedupeIndex", "DedupeRegistry", "minhash"]
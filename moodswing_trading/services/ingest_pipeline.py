@@ -0,0 +1,300 @@
+"""Staged news ingest pipeline.
+
+Collect requests flow through four stages connected by bounded queues::
+
+    fetch -> normalize -> score -> write
+
+``fetch`` runs the news provider look-back per ticker, ``normalize`` sets
+aside already-stored entries, cleans headlines and assigns near-duplicate
+clusters, ``score`` runs sentiment once per new cluster over every job
+waiting in its queue as one batch, and ``write`` bulk-upserts the records
+of every waiting job in one transaction, then folds them into the per-day
+sentiment accumulators. Each stage has its own worker count, so feed
+downloads, inference and database writes for different tickers overlap. Bounded queues apply backpressure upstream when
+a later stage falls behind.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Awaitable, Callable, List
+
+from prometheus_client import Gauge, Histogram
+
+from core.config import get_settings
+from db import crud
+from db.models import SessionLocal
+from utils.timeparse import parse_published
+
+if TYPE_CHECKING:
+    from models import Article
+    from .news_ingest import NewsIngestService
+
+QUEUE_DEPTH = Gauge(
+    "news_pipeline_queue_depth",
+    "Jobs waiting in front of each ingest pipeline stage",
+    ["stage"],
+)
+STAGE_SECONDS = Histogram(
+    "news_pipeline_stage_seconds",
+    "Time spent per ingest pipeline stage invocation",
+    ["stage"],
+)
+
+STAGES = ("fetch", "normalize", "score", "write")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestJob:
+    """One ticker's collect request as it moves through the stages."""
+
+    ticker: str
+    from_dt: datetime
+    to_dt: datetime
+    min_count: int
+    future: asyncio.Future
+    entries: dict[str, dict] = field(default_factory=dict)
+    selected: list[tuple[str, dict]] = field(default_factory=list)
+    known: list["Article"] = field(default_factory=list)
+    titles: list[str] = field(default_factory=list)
+    timestamps: list[datetime] = field(default_factory=list)
+    clusters: list[str] = field(default_factory=list)
+    cluster_scores: dict[str, int] = field(default_factory=dict)
+    sentiments: list[int] = field(default_factory=list)
+    # Budget for the job's own stage work; time queued between stages is free
+    timeout: float | None = None
+    spent: float = 0.0
+
+
+class IngestPipeline:
+    """Run ``NewsIngestService`` collect requests through staged workers.
+
+    Use as an async context manager; :meth:`submit` returns a future
+    resolving to the collected articles for that ticker. Leaving the context
+    drains every queued job before the workers stop.
+    """
+
+    def __init__(
+        self,
+        service: "NewsIngestService",
+        fetch_concurrency: int | None = None,
+        normalize_concurrency: int | None = None,
+        score_concurrency: int | None = None,
+        write_concurrency: int | None = None,
+        queue_size: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.service = service
+        self.concurrency = {
+            "fetch": fetch_concurrency or settings.news_ingest_concurrency,
+            "normalize": normalize_concurrency or settings.news_pipeline_normalize_concurrency,
+            "score": score_concurrency or settings.news_pipeline_score_concurrency,
+            "write": write_concurrency or settings.news_pipeline_write_concurrency,
+        }
+        self.queue_size = queue_size or settings.news_pipeline_queue_size
+        self._queues: dict[str, asyncio.Queue[IngestJob]] = {}
+        self._workers: list[asyncio.Task] = []
+
+    async def __aenter__(self) -> "IngestPipeline":
+        handlers: dict[str, Callable[[List[IngestJob]], Awaitable[None]]] = {
+            "fetch": self._fetch,
+            "normalize": self._normalize,
+            "score": self._score,
+            "write": self._write,
+        }
+        self._queues = {stage: asyncio.Queue(self.queue_size) for stage in STAGES}
+        for i, stage in enumerate(STAGES):
+            downstream = STAGES[i + 1] if i + 1 < len(STAGES) else None
+            # Only score and write gain from taking every waiting job at once
+            batched = stage in ("score", "write")
+            for _ in range(self.concurrency[stage]):
+                self._workers.append(
+                    asyncio.create_task(self._run(stage, handlers[stage], downstream, batched))
+                )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            if exc_info[0] is None:
+                # Each stage hands a job downstream before marking it done, so
+                # joining in order waits for every submitted job to finish.
+                for stage in STAGES:
+                    await self._queues[stage].join()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers.clear()
+            for queue in self._queues.values():
+                while not queue.empty():
+                    queue.get_nowait().future.cancel()
+
+    async def submit(
+        self,
+        ticker: str,
+        from_dt: datetime,
+        to_dt: datetime,
+        min_count: int = 10,
+        timeout: float | None = None,
+    ) -> asyncio.Future:
+        """Queue a collect for ``ticker``; waits while the fetch queue is full.
+
+        ``timeout`` bounds the time stages spend working on the job (for
+        batched stages, the batch it is part of), not the time it waits in
+        queues; when it runs out the future fails with ``TimeoutError``.
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = IngestJob(ticker, from_dt, to_dt, min_count, future, timeout=timeout)
+        await self._put("fetch", job)
+        return future
+
+    async def _put(self, stage: str, job: IngestJob) -> None:
+        queue = self._queues[stage]
+        await queue.put(job)
+        QUEUE_DEPTH.labels(stage).set(queue.qsize())
+
+    async def _run(
+        self,
+        stage: str,
+        handler: Callable[[List[IngestJob]], Awaitable[None]],
+        downstream: str | None,
+        batched: bool,
+    ) -> None:
+        queue = self._queues[stage]
+        while True:
+            jobs = [await queue.get()]
+            while batched and not queue.empty():
+                jobs.append(queue.get_nowait())
+            QUEUE_DEPTH.labels(stage).set(queue.qsize())
+            # Jobs whose caller gave up (timeout, cancellation) are dropped
+            live = [job for job in jobs if not job.future.done()]
+            try:
+                if live:
+                    started = time.perf_counter()
+                    timers = self._start_budgets(live)
+                    try:
+                        await self._until_abandoned(handler(live), live)
+                    except Exception as exc:
+                        logger.exception("news pipeline %s stage failed", stage)
+                        for job in live:
+                            if not job.future.done():
+                                job.future.set_exception(exc)
+                    finally:
+                        elapsed = time.perf_counter() - started
+                        for timer in timers:
+                            timer.cancel()
+                        for job in live:
+                            job.spent += elapsed
+                        STAGE_SECONDS.labels(stage).observe(elapsed)
+                    for job in live:
+                        if downstream and not job.future.done():
+                            await self._put(downstream, job)
+            finally:
+                for _ in jobs:
+                    queue.task_done()
+
+    @staticmethod
+    def _start_budgets(jobs: List[IngestJob]) -> list[asyncio.TimerHandle]:
+        """Fail each job whose remaining budget runs out during this stage."""
+
+        def expire(job: IngestJob) -> None:
+            if not job.future.done():
+                job.future.set_exception(asyncio.TimeoutError())
+
+        loop = asyncio.get_running_loop()
+        return [
+            loop.call_later(max(job.timeout - job.spent, 0.0), expire, job)
+            for job in jobs
+            if job.timeout is not None
+        ]
+
+    @staticmethod
+    async def _until_abandoned(work: Awaitable[None], jobs: List[IngestJob]) -> None:
+        """Await ``work``, cancelling it once every job's caller has given up."""
+        task = asyncio.ensure_future(work)
+        try:
+            while not task.done():
+                waiting = [job.future for job in jobs if not job.future.done()]
+                if not waiting:
+                    task.cancel()
+                    await asyncio.wait([task])
+                    break
+                await asyncio.wait([task, *waiting], return_when=asyncio.FIRST_COMPLETED)
+            if not task.cancelled():
+                task.result()
+        finally:
+            task.cancel()
+
+    async def _fetch(self, jobs: List[IngestJob]) -> None:
+        for job in jobs:
+            job.entries = await self.service.search_entries(
+                job.ticker, job.from_dt, job.to_dt, job.min_count
+            )
+
+    async def _normalize(self, jobs: List[IngestJob]) -> None:
+        for job in jobs:
+            job.selected, job.known = await asyncio.to_thread(
+                self.service.select_new, job.ticker, job.entries, job.min_count
+            )
+            job.titles = [self.service.clean_title(e) for _, e in job.selected]
+            now = datetime.now(timezone.utc)
+            job.timestamps = [parse_published(e) or now for _, e in job.selected]
+            job.clusters, job.cluster_scores = await asyncio.to_thread(
+                self.service.assign_clusters,
+                job.ticker,
+                job.selected,
+                job.titles,
+                job.timestamps,
+            )
+
+    async def _score(self, jobs: List[IngestJob]) -> None:
+        # One batched pass over every waiting ticker, one headline per
+        # near-duplicate cluster that has no stored score yet
+        pending: list[tuple[IngestJob, str, str]] = []
+        for job in jobs:
+            seen: set[str] = set(job.cluster_scores)
+            for cluster_id, title in zip(job.clusters, job.titles):
+                if cluster_id not in seen:
+                    seen.add(cluster_id)
+                    pending.append((job, cluster_id, title))
+        scores = await self.service.sentiment.score_batch([title for _, _, title in pending])
+        for (job, cluster_id, _), score in zip(pending, scores):
+            job.cluster_scores[cluster_id] = score
+        for job in jobs:
+            job.sentiments = [job.cluster_scores[c] for c in job.clusters]
+            self.service.remember_scores(job.ticker, job.selected, job.timestamps, job.sentiments)
+
+    async def _write(self, jobs: List[IngestJob]) -> None:
+        results: list[list["Article"]] = []
+        db_records = []
+        for job in jobs:
+            articles, records = self.service.build_records(
+                job.ticker,
+                job.selected,
+                job.titles,
+                job.sentiments,
+                job.timestamps,
+                job.clusters,
+            )
+            results.append(articles + job.known)
+            db_records.extend(records)
+
+        if db_records:
+            def _save() -> None:
+                with SessionLocal() as db:
+                    crud.save_articles(db, db_records)
+
+            await asyncio.to_thread(_save)
+            await self.service.record_aggregates(db_records)
+        for job, articles in zip(jobs, results):
+            if not job.future.done():
+                job.future.set_result(articles)
+
+
+__all__ = ["IngestJob", "IngestPipeline"]
@@ -0,0 +1,95 @@
+"""Fast finance-lexicon sentiment pass for headlines.
+
+A Loughran-McDonald style word list gives each headline a polarity and a
+confidence in [0, 1). Headlines with no polar hits but with routine-event
+markers ("announces", "completes acquisition", "annual meeting") are scored
+neutral with the same confidence scale. Headlines with no hits at all, or
+with mixed polar hits, get low confidence and are left to the transformer.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+POSITIVE = frozenset(
+    """
+    beat beats record records surge surges surged soar soars soared jump jumps
+    jumped rally rallies rallied gain gains gained rise rises rising climb climbs
+    climbed upgrade upgrades upgraded outperform outperforms outperformed boost
+    boosts boosted exceed exceeds exceeded strong stronger strongest profit
+    profitable profits growth grows grew expand expands expanded rebound
+    rebounds rebounded tops topped raises raised hikes win wins won approval
+    approves approved breakthrough bullish buyback buybacks dividend upbeat
+    """.split()
+)
+
+NEGATIVE = frozenset(
+    """
+    miss misses missed plunge plunges plunged slump slumps slumped fall falls
+    fell drop drops dropped slide slides slid tumble tumbles tumbled sink sinks
+    sank crater craters cratered decline declines declined cut cuts slash
+    slashes slashed loss losses lose loses downgrade downgrades downgraded
+    layoff layoffs lawsuit lawsuits sue sues sued recall recalls probe probes
+    investigation fine fined fines penalty weak weaker weakest warn warns warned
+    warning bankruptcy bankrupt default defaults halt halts halted suspend
+    suspends suspended disappoint disappoints disappointing bearish fraud
+    """.split()
+)
+
+NEUTRAL = frozenset(
+    """
+    announce announces announced name names named appoint appoints appointed
+    hold holds meeting meetings conference webcast presentation present presents
+    schedule schedules scheduled unveil unveils unveiled launch launches launched
+    complete completes completed acquisition acquire acquires spin split
+    annual shareholder shareholders open opens
+    """.split()
+)
+
+_TOKEN = re.compile(r"[a-z]+")
+
+
+class LexiconScorer:
+    """Score headlines by counting positive and negative lexicon words."""
+
+    def __init__(
+        self,
+        positive: frozenset[str] = POSITIVE,
+        negative: frozenset[str] = NEGATIVE,
+        neutral: frozenset[str] = NEUTRAL,
+    ) -> None:
+        self.positive = positive
+        self.negative = negative
+        self.neutral = neutral
+
+    def score(self, texts: Sequence[str]) -> Tuple[List[int], np.ndarray]:
+        """Return ``(scores, confidence)`` for ``texts``.
+
+        Confidence is ``|pos - neg| / (pos + neg + 1)``: 0 for no or evenly
+        mixed hits, 0.5 for a single hit, approaching 1 as agreeing hits grow.
+        A headline without polar hits scores 0 with confidence
+        ``neutral / (neutral + 1)`` from its routine-event markers instead.
+        """
+        counts = np.zeros((len(texts), 3), dtype=np.int32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                if token in self.positive:
+                    counts[row, 0] += 1
+                elif token in self.negative:
+                    counts[row, 1] += 1
+                elif token in self.neutral:
+                    counts[row, 2] += 1
+        net = counts[:, 0] - counts[:, 1]
+        polar = counts[:, :2].sum(axis=1)
+        confidence = np.where(
+            polar > 0,
+            np.abs(net) / (polar + 1),
+            counts[:, 2] / (counts[:, 2] + 1),
+        )
+        return np.sign(net).astype(int).tolist(), confidence
+
+
+__all__ = ["LexiconScorer", "NEGATIVE", "NEUTRAL", "POSITIVE"]
@@ -1,41 +1,61 @@
-"""Google News ingestion and sentiment classification."""
+"""News ingestion and sentiment classification."""
 
 from __future__ import annotations
 
 import asyncio
-import hashlib
-import math
+import logging
 import re
-from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
 from typing import List
-from uuid import uuid4
 
-from dateparser import parse as parse_date
+from prometheus_client import Counter
 
-from utils.pygooglenews import GoogleNews
 from models import Article
-from .sentiment import SentimentService
+from .accumulators import SentimentAccumulators
+from .aggregation import publisher_rank
+from .dedupe import DedupeRegistry
+from .ingest_pipeline import IngestPipeline
+from .news_providers import NewsSources
+from .sentiment import get_sentiment_service
 from db import crud, models as db_models
+from db.compression import pack_json
 from db.models import SessionLocal
+from core.config import get_settings
 
-# Publisher popularity tiers mapped to rank factors in [0.1, 1.0]
-PUBLISHER_RANK = {
-    "Reuters": 1.0,
-    "Bloomberg": 0.9,
-    "CNBC": 0.8,
-}
-DEFAULT_RANK = 0.5
+# Feed entry fields kept in the raw payload when ARTICLE_RAW_JSON_COMPACT is set
+RAW_JSON_FIELDS = ("id", "title", "link", "published", "source")
 
-# Recency decay constant in hours
-DECAY_TAU = 6.0
+INGEST_SKIPPED = Counter(
+    "news_ingest_skipped_total",
+    "Feed entries dropped before scoring and persistence",
+    ["reason"],
+)
+
+INGEST_DUPLICATES = Counter(
+    "news_ingest_duplicates_total",
+    "New articles that joined an existing near-duplicate headline cluster",
+)
+
+logger = logging.getLogger(__name__)
 
 
 class NewsIngestService:
-    """Fetch articles from Google News and label sentiment."""
+    """Fetch articles from the configured news providers and label sentiment."""
 
     def __init__(self) -> None:
-        self.gn = GoogleNews()
-        self.sentiment = SentimentService()
+        settings = get_settings()
+        self.sources = NewsSources()
+        self.raw_json_compact = settings.article_raw_json_compact
+        self.dedupe = (
+            DedupeRegistry(settings.news_dedupe_threshold)
+            if settings.news_dedupe_threshold > 0
+            else None
+        )
+        self.accumulators = (
+            SentimentAccumulators() if settings.sentiment_accumulators else None
+        )
+        self.sentiment = get_sentiment_service()
 
     async def collect(
         self,
@@ -44,76 +64,255 @@ class NewsIngestService:
         to_dt: datetime,
         min_count: int = 10,
     ) -> List[Article]:
-        """Collect new articles and persist them."""
+        """Collect new articles and persist them.
+
+        The first pass searches ``from_dt``..``to_dt``; while fewer than
+        ``min_count`` unique articles are found, each further pass fetches
+        only the one-day slice before the current window (up to 7 passes).
+        Articles are deduplicated by id across passes, near-duplicate
+        headlines share one cluster and one sentiment score, and each unique
+        headline is scored once. Articles already stored for ``ticker`` are
+        not rescored or rewritten; they are returned from their stored rows
+        after the new ones, up to ``min_count`` articles in total.
+        """
+
+        async with IngestPipeline(self, fetch_concurrency=1) as pipeline:
+            future = await pipeline.submit(ticker, from_dt, to_dt, min_count)
+            return await future
+
+    async def collect_many(
+        self,
+        tickers: List[str],
+        from_dt: datetime,
+        to_dt: datetime,
+        min_count: int = 10,
+    ) -> dict[str, List[Article]]:
+        """Collect several tickers through one shared staged pipeline.
+
+        Fetch concurrency and the per-ticker timeout come from
+        ``NEWS_INGEST_CONCURRENCY`` and ``NEWS_INGEST_TICKER_TIMEOUT``; the
+        timeout counts only the pipeline's work on that ticker, not time
+        spent queued behind others. A ticker that fails or times out is
+        logged and maps to ``[]``.
+        """
+
+        settings = get_settings()
+
+        async def _one(ticker: str, future: asyncio.Future) -> List[Article]:
+            try:
+                return await future
+            except asyncio.TimeoutError:
+                logger.warning("news ingest for %s timed out", ticker)
+            except Exception:
+                logger.exception("news ingest for %s failed", ticker)
+            return []
+
+        async with IngestPipeline(self) as pipeline:
+            waits = []
+            for ticker in tickers:
+                future = await pipeline.submit(
+                    ticker,
+                    from_dt,
+                    to_dt,
+                    min_count,
+                    timeout=settings.news_ingest_ticker_timeout,
+                )
+                waits.append(asyncio.ensure_future(_one(ticker, future)))
+            results = await asyncio.gather(*waits)
+        return dict(zip(tickers, results))
+
+    async def search_entries(
+        self, ticker: str, from_dt: datetime, to_dt: datetime, min_count: int
+    ) -> dict[str, dict]:
+        """Run the look-back search and return unique entries keyed by id."""
+
+        entries: dict[str, dict] = {}
+        window_start, window_end = from_dt, to_dt
+        for _ in range(7):
+            found = await self.sources.search(ticker, window_start, window_end)
+            for art_id, entry in found.items():
+                entries.setdefault(art_id, entry)
+            if len(entries) >= min_count:
+                break
+            window_end = window_start
+            window_start = window_start - timedelta(days=1)
+        return entries
+
+    def select_new(
+        self, ticker: str, entries: dict[str, dict], min_count: int
+    ) -> tuple[list[tuple[str, dict]], List[Article]]:
+        """Split entries into new ones to process and already-stored ones.
+
+        Returns up to ``min_count`` new entries, plus the stored articles
+        for known entries that fill the rest of ``min_count``.
+        """
+
+        if not entries:
+            return [], []
+        with SessionLocal() as db:
+            known = crud.get_articles_by_ids(db, ticker.upper(), entries)
+        if known:
+            INGEST_SKIPPED.labels("known").inc(len(known))
+            logger.info("skipped %d known articles for %s", len(known), ticker)
+        fresh = [(art_id, e) for art_id, e in entries.items() if art_id not in known]
+        fresh = fresh[:min_count]
+        stored = [self.to_article(known[art_id]) for art_id in entries if art_id in known]
+        return fresh, stored[: max(min_count - len(fresh), 0)]
+
+    @staticmethod
+    def to_article(row: db_models.Article) -> Article:
+        """API model for a stored article row."""
+        return Article(
+            id=row.id,
+            headline=row.headline,
+            source=row.provider,
+            url=row.url,
+            ts_pub=row.ts_pub.isoformat() + "Z",
+            sentiment=row.sentiment,
+            weight=row.weight,
+        )
+
+    @staticmethod
+    def clean_title(entry: dict) -> str:
+        return re.sub(r"\s[-–—]\s.*", "", entry.get("title", ""))
 
-        def _search(start: str, end: str):
-            return self.gn.search(ticker, from_=start, to_=end)
+    @staticmethod
+    def _seed_clusters(ticker: str, day: date) -> list[tuple]:
+        start = datetime.combine(day, datetime.min.time())
+        with SessionLocal() as db:
+            return crud.get_article_clusters(db, ticker, start, start + timedelta(days=1))
+
+    def assign_clusters(
+        self,
+        ticker: str,
+        selected: list[tuple[str, dict]],
+        titles: List[str],
+        timestamps: List[datetime],
+    ) -> tuple[List[str], dict[str, int]]:
+        """Place each article in its ticker-day near-duplicate cluster.
+
+        Returns the cluster id per article and the known sentiment of
+        clusters whose representative is already scored.
+        """
+
+        if self.dedupe is None:
+            return [art_id for art_id, _ in selected], {}
+        by_day: dict[date, list[int]] = defaultdict(list)
+        for k, ts in enumerate(timestamps):
+            by_day[ts.astimezone(timezone.utc).date()].append(k)
+
+        clusters: List[str] = [""] * len(selected)
+        scores: dict[str, int] = {}
+        for day, idxs in by_day.items():
+            index = self.dedupe.get(ticker, day, seed=self._seed_clusters)
+            with index.lock:
+                ids = index.add([selected[k][0] for k in idxs], [titles[k] for k in idxs])
+                for k, cluster_id in zip(idxs, ids):
+                    clusters[k] = cluster_id
+                    score = index.sentiment(cluster_id)
+                    if score is not None:
+                        scores[cluster_id] = score
+        duplicates = sum(c != art_id for c, (art_id, _) in zip(clusters, selected))
+        if duplicates:
+            INGEST_DUPLICATES.inc(duplicates)
+        return clusters, scores
+
+    def remember_scores(
+        self,
+        ticker: str,
+        selected: list[tuple[str, dict]],
+        timestamps: List[datetime],
+        sentiments: List[int],
+    ) -> None:
+        """Record scores in the dedupe index for later cluster members."""
+
+        if self.dedupe is None:
+            return
+        for (art_id, _), ts, sentiment in zip(selected, timestamps, sentiments):
+            index = self.dedupe.get(ticker, ts.astimezone(timezone.utc).date())
+            with index.lock:
+                index.set_sentiment(art_id, sentiment)
+
+    def build_records(
+        self,
+        ticker: str,
+        selected: list[tuple[str, dict]],
+        titles: List[str],
+        sentiments: List[int],
+        timestamps: List[datetime],
+        clusters: List[str],
+    ) -> tuple[List[Article], List[db_models.Article]]:
+        """Build API and DB articles weighted by publisher rank.
+
+        Recency decay is applied when the day is aggregated, not here, so
+        stored weights stay comparable across fetches.
+        """
 
         articles: List[Article] = []
         db_records: List[db_models.Article] = []
-        look_back = 0
-        cur_start = from_dt
-        while len(articles) < min_count and look_back < 7:
-            res = await asyncio.to_thread(
-                _search, cur_start.strftime("%Y-%m-%d"), to_dt.strftime("%Y-%m-%d")
-            )
-            for entry in res.get("entries", []):
-                title = re.sub(r"\s[-–—]\s.*", "", entry.get("title", ""))
-                ts_raw = entry.get("published")
-                ts = parse_date(ts_raw) or datetime.utcnow()
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-                now = datetime.now(timezone.utc)
-                age_hours = max((now - ts).total_seconds() / 3600, 0.0)
-                source = entry.get("source", {}).get("title", "Unknown")
-                link = entry.get("link", "")
-                sentiment = await self.sentiment.score(title)
-                art_id = hashlib.sha256((link or str(uuid4())).encode()).hexdigest()
-                rank = PUBLISHER_RANK.get(source, DEFAULT_RANK)
-                time_factor = math.exp(-age_hours / DECAY_TAU)
-                weight = rank * time_factor
-                articles.append(
-                    Article(
-                        id=art_id,
-                        headline=title,
-                        source=source,
-                        url=link,
-                        ts_pub=ts.isoformat() + "Z",
-                        sentiment=sentiment,
-                        weight=weight,
-                    )
+        for (art_id, entry), title, sentiment, ts, cluster_id in zip(
+            selected, titles, sentiments, timestamps, clusters
+        ):
+            source = entry.get("source", {}).get("title", "Unknown")
+            link = entry.get("link", "")
+            weight = publisher_rank(source)
+            articles.append(
+                Article(
+                    id=art_id,
+                    headline=title,
+                    source=source,
+                    url=link,
+                    ts_pub=ts.isoformat() + "Z",
+                    sentiment=sentiment,
+                    weight=weight,
                 )
-                db_records.append(
-                    db_models.Article(
-                        id=art_id,
-                        ticker=ticker.upper(),
-                        headline=title,
-                        ts_pub=ts,
-                        sentiment=sentiment,
-                        provider=source,
-                        url=link,
-                        weight=weight,
-                        raw_json=entry,
-                    )
+            )
+            db_records.append(
+                db_models.Article(
+                    id=art_id,
+                    ticker=ticker.upper(),
+                    headline=title,
+                    ts_pub=ts,
+                    sentiment=sentiment,
+                    provider=source,
+                    url=link,
+                    weight=weight,
+                    cluster_id=cluster_id,
+                    raw_zstd=pack_json(
+                        {k: entry[k] for k in RAW_JSON_FIELDS if k in entry}
+                        if self.raw_json_compact
+                        else entry
+                    ),
                 )
-            if len(articles) < min_count:
-                look_back += 1
-                cur_start = cur_start - timedelta(days=1)
-            else:
-                break
+            )
+        return articles, db_records
 
-        articles = articles[:min_count]
-        db_records = db_records[: len(articles)]
+    async def record_aggregates(self, records: List[db_models.Article]) -> None:
+        """Fold persisted rows into the day accumulators and publish
+        provisional scores. Best effort: the hourly refresh falls back to
+        SQL when Redis is unavailable."""
 
-        if db_records:
-            total_w = sum(r.weight for r in db_records)
-            if total_w > 0:
-                for r in db_records:
-                    r.weight = r.weight / total_w
-            with SessionLocal() as db:
-                crud.save_articles(db, db_records)
+        if self.accumulators is None or not records:
+            return
+        try:
+            keys = await self.accumulators.add(records)
+        except Exception:
+            logger.warning("sentiment accumulator update failed", exc_info=True)
+            # The rows are stored but not counted; drop the days so readers
+            # fall back to SQL and the next update reseeds them
+            try:
+                await self.accumulators.discard(self.accumulators.day_keys(records))
+            except Exception:
+                logger.warning("could not discard stale sentiment accumulators", exc_info=True)
+            return
+        try:
+            await self.accumulators.publish_provisional(keys)
+        except Exception:
+            logger.warning("provisional sentiment publish failed", exc_info=True)
 
-        return articles
+    async def aclose(self) -> None:
+        """Release provider resources (pooled HTTP clients) bound to the running loop."""
+        await self.sources.aclose()
 
     async def fetch(
         self,
@@ -167,17 +366,6 @@ class NewsIngestService:
                 return articles, next_cursor, prev_cursor
 
         rows, next_cursor, prev_cursor = await asyncio.to_thread(_query)
-        articles = [
-            Article(
-                id=r.id,
-                headline=r.headline,
-                source=r.provider,
-                url=r.url,
-                ts_pub=r.ts_pub.isoformat() + "Z",
-                sentiment=r.sentiment,
-                weight=r.weight,
-            )
-            for r in rows
-        ]
+        articles = [self.to_article(r) for r in rows]
 
         return articles, next_cursor, prev_cursor
\ No newline at end of file
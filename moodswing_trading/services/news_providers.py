@@ -0,0 +1,233 @@
+"""Pluggable news sources for ingest.
+
+A :class:`NewsProvider` returns feedparser-style entries (``title``,
+``link``, ``published``/``published_parsed``, ``source``) for a query and
+date window. :class:`NewsSources` queries every configured provider
+concurrently, each under its own timeout, and merges their entries keyed by
+URL hash so the same story from two sources is ingested once.
+
+Providers are configured with ``NEWS_PROVIDERS``, a comma-separated list of
+names with an optional per-provider timeout in seconds, e.g.
+``google,local:2``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import feedparser
+from prometheus_client import Counter, Histogram
+
+from core.config import get_settings
+from utils.feed_cache import FeedCache
+from utils.pygooglenews import GoogleNews
+from utils.timeparse import parse_published
+
+PROVIDER_LATENCY = Histogram(
+    "news_provider_latency_seconds",
+    "Time per news provider search call",
+    ["provider"],
+)
+PROVIDER_FAILURES = Counter(
+    "news_provider_failures_total",
+    "News provider searches that timed out or raised",
+    ["provider", "reason"],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def article_id(entry: dict) -> str:
+    """Stable article id: the SHA-256 of the entry URL."""
+    link = entry.get("link", "")
+    return hashlib.sha256((link or str(uuid4())).encode()).hexdigest()
+
+
+class NewsProvider:
+    """Base class for a source of feed entries."""
+
+    name = "base"
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self.timeout = timeout or get_settings().news_provider_timeout
+
+    async def search(self, query: str, from_dt: datetime, to_dt: datetime) -> List[dict]:
+        """Return entries matching ``query`` published from ``from_dt``
+        through ``to_dt`` (day granularity)."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release resources bound to the running loop."""
+
+
+class GoogleNewsProvider(NewsProvider):
+    """Google News RSS search over the pooled async transport."""
+
+    name = "google"
+
+    def __init__(self, timeout: float | None = None) -> None:
+        super().__init__(timeout)
+        settings = get_settings()
+        self.gn = GoogleNews(
+            timeout=settings.news_http_timeout,
+            retries=settings.news_http_retries,
+            backoff=settings.news_http_backoff,
+            max_connections=settings.news_http_max_connections,
+            feed_cache=FeedCache() if settings.news_feed_cache_ttl_seconds > 0 else None,
+            parse_sub_articles=False,
+        )
+
+    async def search(self, query: str, from_dt: datetime, to_dt: datetime) -> List[dict]:
+        res = await self.gn.asearch(
+            query,
+            from_=from_dt.strftime("%Y-%m-%d"),
+            to_=to_dt.strftime("%Y-%m-%d"),
+        )
+        return res.get("entries", [])
+
+    async def aclose(self) -> None:
+        await self.gn.aclose()
+
+
+class LocalFeedProvider(NewsProvider):
+    """RSS/Atom files in a local directory; no network access.
+
+    Every ``*.xml``, ``*.rss`` and ``*.atom`` file under ``NEWS_LOCAL_DIR``
+    is parsed once per modification time. Entries match when ``query``
+    appears as a word in the title or summary.
+    """
+
+    name = "local"
+    SUFFIXES = (".xml", ".rss", ".atom")
+
+    def __init__(self, directory: str | None = None, timeout: float | None = None) -> None:
+        super().__init__(timeout)
+        self.directory = Path(directory or get_settings().news_local_dir)
+        self._parsed: Dict[Path, Tuple[float, List[dict]]] = {}
+
+    def _entries(self) -> List[dict]:
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"news directory {self.directory} does not exist")
+        entries: List[dict] = []
+        for path in sorted(self.directory.rglob("*")):
+            if path.suffix.lower() not in self.SUFFIXES:
+                continue
+            mtime = os.stat(path).st_mtime
+            cached = self._parsed.get(path)
+            if cached is None or cached[0] != mtime:
+                d = feedparser.parse(str(path))
+                feed_title = d.feed.get("title") or path.stem
+                parsed = []
+                for entry in d.entries:
+                    entry.setdefault("source", {"title": feed_title})
+                    parsed.append(entry)
+                cached = self._parsed[path] = (mtime, parsed)
+            entries.extend(cached[1])
+        return entries
+
+    def _search(self, query: str, from_dt: datetime, to_dt: datetime) -> List[dict]:
+        pattern = re.compile(rf"\b{re.escape(query)}\b", re.IGNORECASE)
+        first, last = from_dt.date(), to_dt.date()
+        matches = []
+        for entry in self._entries():
+            text = f"{entry.get('title', '')} {entry.get('summary', '')}"
+            if not pattern.search(text):
+                continue
+            ts = parse_published(entry)
+            if ts is not None and not first <= ts.date() <= last:
+                continue
+            matches.append(entry)
+        return matches
+
+    async def search(self, query: str, from_dt: datetime, to_dt: datetime) -> List[dict]:
+        return await asyncio.to_thread(self._search, query, from_dt, to_dt)
+
+
+PROVIDERS = {
+    GoogleNewsProvider.name: GoogleNewsProvider,
+    LocalFeedProvider.name: LocalFeedProvider,
+}
+
+
+def build_providers(spec: str | None = None) -> List[NewsProvider]:
+    """Instantiate providers from a ``name[:timeout],...`` spec."""
+    spec = get_settings().news_providers if spec is None else spec
+    providers: List[NewsProvider] = []
+    for item in spec.split(","):
+        name, _, timeout = item.strip().partition(":")
+        if not name:
+            continue
+        try:
+            cls = PROVIDERS[name.lower()]
+        except KeyError:
+            raise ValueError(
+                f"unknown news provider {name!r}; expected one of {sorted(PROVIDERS)}"
+            ) from None
+        providers.append(cls(timeout=float(timeout) if timeout else None))
+    if not providers:
+        raise ValueError("NEWS_PROVIDERS must name at least one provider")
+    return providers
+
+
+class NewsSources:
+    """Query several providers concurrently and merge their entries."""
+
+    def __init__(self, providers: Optional[Sequence[NewsProvider]] = None) -> None:
+        self.providers = list(providers) if providers is not None else build_providers()
+
+    async def _search_one(
+        self, provider: NewsProvider, query: str, from_dt: datetime, to_dt: datetime
+    ) -> List[dict]:
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                provider.search(query, from_dt, to_dt), timeout=provider.timeout
+            )
+        except asyncio.TimeoutError:
+            PROVIDER_FAILURES.labels(provider.name, "timeout").inc()
+            logger.warning("news provider %s timed out for %s", provider.name, query)
+        except Exception:
+            PROVIDER_FAILURES.labels(provider.name, "error").inc()
+            logger.exception("news provider %s failed for %s", provider.name, query)
+        finally:
+            PROVIDER_LATENCY.labels(provider.name).observe(time.perf_counter() - started)
+        return []
+
+    async def search(self, query: str, from_dt: datetime, to_dt: datetime) -> Dict[str, dict]:
+        """Return entries from every provider keyed by :func:`article_id`.
+
+        A provider that fails or exceeds its timeout contributes nothing;
+        the others are unaffected. Earlier providers win on duplicate URLs.
+        """
+        results = await asyncio.gather(
+            *(self._search_one(p, query, from_dt, to_dt) for p in self.providers)
+        )
+        merged: Dict[str, dict] = {}
+        for entries in results:
+            for entry in entries:
+                merged.setdefault(article_id(entry), entry)
+        return merged
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.aclose()
+
+
+__all__ = [
+    "GoogleNewsProvider",
+    "LocalFeedProvider",
+    "NewsProvider",
+    "NewsSources",
+    "PROVIDERS",
+    "article_id",
+    "build_providers",
+]
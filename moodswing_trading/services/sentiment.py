@@ -1,39 +1,173 @@
-"""Sentiment classification service using transformers pipeline."""
+"""Sentiment classification service backed by a pluggable inference backend."""
 
 from __future__ import annotations
 
 import asyncio
-from transformers import pipeline
+import logging
 from datetime import date, timedelta
-from typing import AsyncGenerator, Any, Union
+from typing import AsyncGenerator, Any, List, Sequence, Union
 import contextlib
 import json
+from functools import lru_cache
 import redis.asyncio as redis
+from prometheus_client import Counter
 
 from db import crud
 from db.models import SessionLocal
 from core.config import get_settings
+from utils.batching import MicroBatcher
+from .sentiment_backends import (
+    DEFAULT_MODEL,
+    RemoteBackend,
+    SentimentBackend,
+    get_backend,
+    model_version,
+)
+from .sentiment_cache import SentimentCache
+from .lexicon import LexiconScorer
+
+TIER_SCORED = Counter(
+    "sentiment_tier_scored_total",
+    "Headlines resolved per sentiment scoring tier",
+    ["tier"],
+)
+
+logger = logging.getLogger(__name__)
 
 
 class SentimentService:
-    """Wraps a text-classification model returning -1, 0, 1 scores."""
+    """Wraps a text-classification model returning -1, 0, 1 scores.
 
-    def __init__(self, model_name: str = "nickmuchi/deberta-v3-base-finetuned-finance-text-classification") -> None:
-        self._pipeline = pipeline("text-classification", model=model_name)
+    Concurrent :meth:`score` calls are merged into micro-batches so the model
+    runs one forward pass per batch instead of one per headline. Scores are
+    memoized per normalized headline and model version in :attr:`cache`.
 
-    async def score(self, text: str) -> int:
-        """Return sentiment score for ``text`` (-1 bearish, 0 neutral, 1 bullish)."""
+    The model is not loaded until the first inference (or :meth:`warm_up`)
+    and is shared with every other service in the process. When
+    ``lexicon_threshold`` is set, a lexicon pass resolves confident headlines
+    first and only the rest reach the model.
+    """
 
-        def _predict() -> int:
-            result = self._pipeline(text)[0]
-            label = result.get("label", "").lower()
-            if label == "bullish":
-                return 1
-            if label == "bearish":
-                return -1
-            return 0
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        backend: str | None = None,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+        lexicon_threshold: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.model_name = model_name
+        self.backend_name = (backend or settings.sentiment_backend).lower()
+        self.max_batch_size = max_batch_size or settings.sentiment_batch_size
+        self.max_wait_ms = (
+            settings.sentiment_batch_wait_ms if max_wait_ms is None else max_wait_ms
+        )
+        self.lexicon_threshold = (
+            settings.sentiment_lexicon_threshold
+            if lexicon_threshold is None
+            else lexicon_threshold
+        )
+        self.lexicon = LexiconScorer() if self.lexicon_threshold is not None else None
+        self._version_suffix = (
+            f"+lexicon{self.lexicon_threshold:g}" if self.lexicon is not None else ""
+        )
+        self.model_version = model_version(model_name, self.backend_name) + self._version_suffix
+        self.cache = SentimentCache(self.model_version)
+        self._batcher: MicroBatcher[str, int] | None = None
+
+    @property
+    def backend(self) -> SentimentBackend:
+        return get_backend(self.backend_name, self.model_name)
+
+    async def warm_up(self) -> None:
+        """Load the shared model in a worker thread without scoring anything."""
+        await asyncio.to_thread(get_backend, self.backend_name, self.model_name)
+
+    async def _sync_version(self) -> None:
+        """Key the cache by the model version a remote server reports.
+
+        A server switched to another backend is picked up within
+        ``VERSION_TTL`` seconds; until the first report, scores are cached
+        under ``<model>@remote``.
+        """
+        if self.backend_name != RemoteBackend.name:
+            return
+        backend = self.backend
+        version = backend.version
+        if version is None:
+            try:
+                version = await asyncio.to_thread(backend.fetch_version)
+            except Exception:
+                logger.warning("sentiment server version unavailable", exc_info=True)
+                return
+        self.model_version = version + self._version_suffix
+        self.cache.model_version = self.model_version
+
+    def _predict(self, texts: List[str]) -> List[int]:
+        # Resolved in the worker thread so a first-use model load never
+        # blocks the event loop.
+        return self.backend.predict(texts)
+
+    async def _infer(self, texts: List[str]) -> List[int]:
+        # Chunk in length order so each forward pass pads little; the backend
+        # buckets again by token length inside each chunk.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        scores = [0] * len(texts)
+        for start in range(0, len(order), self.max_batch_size):
+            idx = order[start : start + self.max_batch_size]
+            chunk = await asyncio.to_thread(self._predict, [texts[i] for i in idx])
+            for i, score in zip(idx, chunk):
+                scores[i] = score
+        return scores
+
+    async def _tiered(self, texts: List[str]) -> List[int]:
+        if self.lexicon is None:
+            TIER_SCORED.labels("transformer").inc(len(texts))
+            return await self._infer(texts)
+        scores, confidence = self.lexicon.score(texts)
+        escalate = [i for i, c in enumerate(confidence) if c < self.lexicon_threshold]
+        TIER_SCORED.labels("lexicon").inc(len(texts) - len(escalate))
+        TIER_SCORED.labels("transformer").inc(len(escalate))
+        if escalate:
+            inferred = await self._infer([texts[i] for i in escalate])
+            for i, score in zip(escalate, inferred):
+                scores[i] = score
+        return scores
+
+    async def _infer_and_store(self, texts: List[str]) -> List[int]:
+        unique = list(dict.fromkeys(texts))
+        fresh = dict(zip(unique, await self._tiered(unique)))
+        await self._sync_version()
+        await self.cache.set_many(fresh)
+        return [fresh[t] for t in texts]
+
+    async def score_batch(self, texts: Sequence[str]) -> List[int]:
+        """Return sentiment scores for ``texts`` in input order.
+
+        Cached headlines are answered without inference; the rest are scored
+        once each, however often they repeat in ``texts``.
+        """
+        texts = list(texts)
+        await self._sync_version()
+        scores = await self.cache.get_many(texts)
+        misses = [t for t in dict.fromkeys(texts) if t not in scores]
+        if misses:
+            scores.update(zip(misses, await self._infer_and_store(misses)))
+        return [scores[t] for t in texts]
 
-        return await asyncio.to_thread(_predict)
+    async def score(self, text: str) -> int:
+        """Return sentiment score for ``text`` (-1 bearish, 0 neutral, 1 bullish)."""
+        await self._sync_version()
+        cached = await self.cache.get_many([text])
+        if text in cached:
+            return cached[text]
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.loop is not loop:
+            self._batcher = MicroBatcher(
+                self._infer_and_store, self.max_batch_size, self.max_wait_ms
+            )
+        return await self._batcher.submit(text)
 
     async def get_day_score(self, ticker: str, dt: date):
         """Fetch sentiment record for the given ticker and date from the DB."""
@@ -101,4 +235,10 @@ class SentimentService:
                     await task
             await pubsub.unsubscribe("sentiment_day")
             await pubsub.close()
-            await client.close()
\ No newline at end of file
+            await client.close()
+
+
+@lru_cache()
+def get_sentiment_service() -> SentimentService:
+    """Return the process-wide :class:`SentimentService`."""
+    return SentimentService()
@@ -0,0 +1,367 @@
+"""Inference backends for the finance sentiment classifier.
+
+Each backend turns a list of headlines into -1/0/1 scores. ``torch`` runs the
+full-precision transformers model; ``onnx`` runs a dynamically INT8
+quantized ONNX export of the same model under ONNX Runtime on CPU; ``remote``
+forwards batches to a local :mod:`services.sentiment_server` process.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+from urllib.parse import urlparse
+
+from core.config import get_settings
+
+DEFAULT_MODEL = "nickmuchi/deberta-v3-base-finetuned-finance-text-classification"
+
+# How long a remote client trusts the server's last reported model version
+VERSION_TTL = 60.0
+
+
+def model_version(model_name: str, backend: str) -> str:
+    """Identify the scores of ``model_name`` run on ``backend``."""
+    return f"{model_name}@{backend.lower()}"
+
+
+def label_to_score(label: str) -> int:
+    """Map a model label to -1 (bearish), 0 (neutral) or 1 (bullish)."""
+    label = (label or "").lower()
+    if label == "bullish":
+        return 1
+    if label == "bearish":
+        return -1
+    return 0
+
+
+class SentimentBackend:
+    """Base class for sentiment inference backends."""
+
+    name = "base"
+
+    def predict(self, texts: List[str]) -> List[int]:
+        """Return one score per text, in input order (blocking)."""
+        raise NotImplementedError
+
+
+def length_buckets(lengths: Sequence[int], bucket_size: int) -> List[List[int]]:
+    """Group input positions into buckets of similar token length.
+
+    Positions are sorted longest first and cut into runs of ``bucket_size``
+    so each bucket pads only to its own longest member.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True)
+    size = max(1, bucket_size)
+    return [order[i : i + size] for i in range(0, len(order), size)]
+
+
+class BucketedBackend(SentimentBackend):
+    """In-process model fed length-bucketed, dynamically padded batches.
+
+    Subclasses set ``_tokenizer`` and ``_id2label`` and implement
+    :meth:`_logits` for one padded bucket.
+    """
+
+    _tokenizer: Any
+    _id2label: Dict[int, str]
+
+    def __init__(self, max_length: int | None = None, bucket_size: int | None = None) -> None:
+        settings = get_settings()
+        self.max_length = max_length or settings.sentiment_max_tokens
+        self.bucket_size = bucket_size or settings.sentiment_bucket_size
+
+    def _logits(self, batch: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def predict(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = self._tokenizer(texts, truncation=True, max_length=self.max_length)
+        features = [
+            {key: values[i] for key, values in encoded.items()} for i in range(len(texts))
+        ]
+        lengths = [len(f["input_ids"]) for f in features]
+        scores = [0] * len(texts)
+        for bucket in length_buckets(lengths, self.bucket_size):
+            batch = self._tokenizer.pad(
+                [features[i] for i in bucket], padding="longest", return_tensors="np"
+            )
+            logits = self._logits(batch)
+            for i, label_id in zip(bucket, logits.argmax(axis=-1)):
+                scores[i] = label_to_score(self._id2label[int(label_id)])
+        return scores
+
+
+class TorchBackend(BucketedBackend):
+    """Full-precision ``transformers`` sequence-classification model."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self._model.eval()
+        self._id2label = self._model.config.id2label
+
+    def _logits(self, batch: Dict[str, Any]) -> Any:
+        import torch
+
+        with torch.inference_mode():
+            inputs = {k: torch.from_numpy(v.astype("int64")) for k, v in batch.items()}
+            return self._model(**inputs).logits.numpy()
+
+
+def export_onnx_model(model_name: str, out_dir: str | Path) -> Path:
+    """Export ``model_name`` to ONNX with dynamic INT8 weights.
+
+    Artifacts are written once under ``out_dir/<model>`` and reused; a file
+    lock keeps concurrent workers from exporting the same model twice. The
+    quantized model is moved into place last, so its presence means the
+    tokenizer and config are complete too.
+    """
+    target = Path(out_dir) / model_name.replace("/", "--")
+    quantized = target / "model.int8.onnx"
+    if quantized.exists():
+        return target
+
+    from filelock import FileLock
+
+    target.mkdir(parents=True, exist_ok=True)
+    with FileLock(str(target) + ".lock"):
+        if quantized.exists():
+            return target
+
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        tokenizer.save_pretrained(target)
+        model.config.save_pretrained(target)
+
+        encoded = tokenizer(["Shares rise after earnings beat"], return_tensors="pt")
+        # Graph inputs follow forward()'s parameter order, not the tokenizer's
+        # key order, and input_names are assigned by position
+        params = inspect.signature(model.forward).parameters
+        sample = {name: encoded[name] for name in params if name in encoded}
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in sample}
+        dynamic_axes["logits"] = {0: "batch"}
+        fp32 = target / "model.onnx"
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample,),
+                str(fp32),
+                input_names=list(sample),
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        partial = target / "model.int8.partial.onnx"
+        quantize_dynamic(str(fp32), str(partial), weight_type=QuantType.QInt8)
+        fp32.unlink(missing_ok=True)
+        os.replace(partial, quantized)
+    return target
+
+
+class OnnxBackend(BucketedBackend):
+    """INT8-quantized ONNX Runtime session on the CPU execution provider."""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        threads: int | None = None,
+        cache_dir: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        settings = get_settings()
+        threads = settings.sentiment_onnx_threads if threads is None else threads
+        cache_dir = cache_dir or settings.sentiment_onnx_dir
+        path = export_onnx_model(model_name, cache_dir)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            str(path / "model.int8.onnx"), opts, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(path)
+        self._id2label = AutoConfig.from_pretrained(path).id2label
+
+    def _logits(self, batch: Dict[str, Any]) -> Any:
+        feeds = {k: v.astype("int64") for k, v in batch.items() if k in self._inputs}
+        return self._session.run(None, feeds)[0]
+
+
+def parse_address(url: str) -> Tuple[str, str | Tuple[str, int]]:
+    """Split ``unix:///path`` or ``tcp://host:port`` into (family, address)."""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return "unix", parsed.path
+    if parsed.scheme == "tcp":
+        return "tcp", (parsed.hostname or "127.0.0.1", parsed.port or 8765)
+    raise ValueError(f"unsupported sentiment server url {url!r}")
+
+
+class RemoteBackend(SentimentBackend):
+    """Client backend that forwards batches to a sentiment server."""
+
+    name = "remote"
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        url: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.model_name = model_name
+        self.family, self.address = parse_address(url or settings.sentiment_server_url)
+        self.timeout = timeout or settings.sentiment_server_timeout
+        # predict() runs in asyncio.to_thread workers; one connection each
+        self._local = threading.local()
+        self._version: str | None = None
+        self._version_at = 0.0
+
+    @property
+    def version(self) -> str | None:
+        """The server's :func:`model_version`, or None when not reported
+        within the last ``VERSION_TTL`` seconds."""
+        if time.monotonic() - self._version_at > VERSION_TTL:
+            return None
+        return self._version
+
+    def fetch_version(self) -> str:
+        """Ask the server for its model version with an empty batch."""
+        self.predict([])
+        return self._version or model_version(self.model_name, self.name)
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        if self.family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        else:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+        return sock, sock.makefile("rwb")
+
+    def _close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            for part in reversed(conn):
+                try:
+                    part.close()
+                except OSError:
+                    pass
+
+    def _roundtrip(self, line: bytes) -> dict:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        stream = conn[1]
+        stream.write(line)
+        stream.flush()
+        reply = stream.readline()
+        if not reply:
+            raise ConnectionError("sentiment server closed the connection")
+        return json.loads(reply)
+
+    def predict(self, texts: List[str]) -> List[int]:
+        line = json.dumps({"texts": texts}).encode() + b"\n"
+        for attempt in range(2):
+            try:
+                reply = self._roundtrip(line)
+                break
+            except ConnectionError:
+                # Reset or EOF on a pooled connection (server restart);
+                # resend once on a new one
+                self._close()
+                if attempt:
+                    raise
+            except Exception:
+                # A timeout may leave the reply in flight on this socket, so
+                # it is never reused, and the batch is not sent again
+                self._close()
+                raise
+        if reply.get("version"):
+            self._version, self._version_at = reply["version"], time.monotonic()
+        if "error" in reply:
+            raise RuntimeError(f"sentiment server error: {reply['error']}")
+        return [int(s) for s in reply["scores"]]
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxBackend.name: OnnxBackend,
+    RemoteBackend.name: RemoteBackend,
+}
+
+
+def load_backend(name: str, model_name: str) -> SentimentBackend:
+    """Instantiate the backend registered under ``name``."""
+    try:
+        cls = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"unknown sentiment backend {name!r}; expected one of {sorted(BACKENDS)}"
+        ) from None
+    return cls(model_name)
+
+
+# Process-wide registry so every SentimentService in a worker shares one
+# loaded model, created on first use.
+_registry: Dict[Tuple[str, str], SentimentBackend] = {}
+_registry_lock = threading.Lock()
+
+
+def get_backend(name: str, model_name: str = DEFAULT_MODEL) -> SentimentBackend:
+    """Return the shared backend for ``(name, model_name)``, loading it once."""
+    key = (name.lower(), model_name)
+    backend = _registry.get(key)
+    if backend is None:
+        with _registry_lock:
+            backend = _registry.get(key)
+            if backend is None:
+                backend = load_backend(name, model_name)
+                _registry[key] = backend
+    return backend
+
+
+__all__ = [
+    "DEFAULT_MODEL",
+    "SentimentBackend",
+    "BucketedBackend",
+    "TorchBackend",
+    "OnnxBackend",
+    "RemoteBackend",
+    "BACKENDS",
+    "export_onnx_model",
+    "get_backend",
+    "label_to_score",
+    "length_buckets",
+    "load_backend",
+    "model_version",
+    "parse_address",
+]
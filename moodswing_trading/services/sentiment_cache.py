@@ -0,0 +1,126 @@
+"""Content-addressed memo cache for headline sentiment scores.
+
+Scores are keyed by a hash of the normalized headline and the model version,
+so a syndicated headline seen under several tickers or look-back passes is
+scored once. Lookups hit a bounded in-process LRU first, then Redis.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Mapping
+
+from prometheus_client import Counter
+
+from core.config import get_settings
+from utils.cache import get_cache
+
+CACHE_LOOKUPS = Counter(
+    "sentiment_cache_lookups_total",
+    "Sentiment memo cache lookups by outcome",
+    ["result"],
+)
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_headline(text: str) -> str:
+    """Return a canonical form of ``text`` for cache keying."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WS.sub(" ", text).strip().lower()
+
+
+class SentimentCache:
+    """Two-tier (LRU + Redis) cache of ``headline -> score``."""
+
+    def __init__(
+        self,
+        model_version: str,
+        max_entries: int | None = None,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.model_version = model_version
+        self.max_entries = max_entries or settings.sentiment_cache_size
+        self.ttl_seconds = ttl_seconds or settings.sentiment_cache_ttl_seconds
+        self._lru: OrderedDict[str, int] = OrderedDict()
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(
+            f"{self.model_version}\x00{normalize_headline(text)}".encode()
+        ).hexdigest()
+        return f"sentiment:memo:{digest}"
+
+    def _remember(self, key: str, score: int) -> None:
+        self._lru[key] = score
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, texts: Iterable[str]) -> Dict[str, int]:
+        """Return cached scores for ``texts`` keyed by the original text."""
+        found: Dict[str, int] = {}
+        remote: Dict[str, str] = {}
+        for text in dict.fromkeys(texts):
+            key = self.key(text)
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                found[text] = self._lru[key]
+                self.hits_local += 1
+                CACHE_LOOKUPS.labels("hit_local").inc()
+            else:
+                remote[text] = key
+
+        if remote:
+            try:
+                values = await get_cache().mget(list(remote.values()))
+            except Exception:
+                # Redis unavailable → local tier only
+                values = [None] * len(remote)
+            for (text, key), value in zip(remote.items(), values):
+                if value is None:
+                    self.misses += 1
+                    CACHE_LOOKUPS.labels("miss").inc()
+                    continue
+                score = int(value)
+                self._remember(key, score)
+                found[text] = score
+                self.hits_redis += 1
+                CACHE_LOOKUPS.labels("hit_redis").inc()
+        return found
+
+    async def set_many(self, scores: Mapping[str, int]) -> None:
+        """Store ``text -> score`` pairs in both tiers."""
+        if not scores:
+            return
+        keyed = {self.key(text): score for text, score in scores.items()}
+        for key, score in keyed.items():
+            self._remember(key, score)
+        try:
+            pipe = get_cache().pipeline(transaction=False)
+            for key, score in keyed.items():
+                pipe.set(key, score, ex=self.ttl_seconds)
+            await pipe.execute()
+        except Exception:
+            # best-effort cache
+            pass
+
+    def stats(self) -> Dict[str, float]:
+        """Return lookup counters and the overall hit rate."""
+        total = self.hits_local + self.hits_redis + self.misses
+        hits = self.hits_local + self.hits_redis
+        return {
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+__all__ = ["SentimentCache", "normalize_headline", "CACHE_LOOKUPS"]
@@ -0,0 +1,109 @@
+"""Local sentiment inference server.
+
+One server process owns the model and micro-batches requests from every
+connected web or Celery process. The wire protocol is newline-delimited JSON
+over a Unix socket or local TCP port::
+
+    -> {"texts": ["headline", ...]}
+    <- {"scores": [1, 0, ...], "version": "<model>@<backend>"}  or  {"error": "..."}
+
+Clients key their score caches by the reported ``version``; an empty batch
+asks for it without scoring anything.
+
+Run with ``python -m services.sentiment_server --listen unix:///tmp/mst.sock``
+and point clients at it with ``SENTIMENT_BACKEND=remote`` and
+``SENTIMENT_SERVER_URL``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import List
+
+from core.config import get_settings
+from utils.batching import MicroBatcher
+from .sentiment_backends import (
+    DEFAULT_MODEL,
+    RemoteBackend,
+    get_backend,
+    model_version,
+    parse_address,
+)
+
+# Large enough for a full batch of long headlines on one line
+STREAM_LIMIT = 4 * 1024 * 1024
+
+
+class SentimentServer:
+    """Serve batched scoring for one shared backend."""
+
+    def __init__(
+        self,
+        backend: str,
+        model_name: str = DEFAULT_MODEL,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        if backend.lower() == RemoteBackend.name:
+            raise ValueError("the sentiment server needs a local backend")
+        self.backend_name = backend
+        self.model_name = model_name
+        self.version = model_version(model_name, backend)
+        self.max_batch_size = max_batch_size or settings.sentiment_batch_size
+        self.max_wait_ms = (
+            settings.sentiment_batch_wait_ms if max_wait_ms is None else max_wait_ms
+        )
+        self._batcher: MicroBatcher[str, int] | None = None
+
+    async def _predict(self, texts: List[str]) -> List[int]:
+        backend = get_backend(self.backend_name, self.model_name)
+        return await asyncio.to_thread(backend.predict, texts)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    texts = json.loads(line)["texts"]
+                    scores = await asyncio.gather(*(self._batcher.submit(t) for t in texts))
+                    reply = {"scores": scores, "version": self.version}
+                except Exception as exc:
+                    reply = {"error": str(exc)}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, url: str) -> None:
+        """Load the model, then accept connections on ``url`` forever."""
+        await asyncio.to_thread(get_backend, self.backend_name, self.model_name)
+        self._batcher = MicroBatcher(self._predict, self.max_batch_size, self.max_wait_ms)
+        family, address = parse_address(url)
+        if family == "unix":
+            server = await asyncio.start_unix_server(self._handle, address, limit=STREAM_LIMIT)
+        else:
+            host, port = address
+            server = await asyncio.start_server(self._handle, host, port, limit=STREAM_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the local sentiment inference server.")
+    parser.add_argument("--listen", default=settings.sentiment_server_url)
+    parser.add_argument("--backend", default=settings.sentiment_server_backend)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args()
+    asyncio.run(SentimentServer(args.backend, args.model).serve(args.listen))
+
+
+__all__ = ["SentimentServer", "main"]
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 
 from datetime import datetime, timedelta
 
@@ -13,6 +14,7 @@ from moodswing_trading.core.celery_app import celery_app
 from moodswing_trading.core.config import get_settings
 from moodswing_trading.core.logging import setup_logging
 from services.news_ingest import NewsIngestService
+from utils.cache import close_cache
 
 
 setup_logging()
@@ -21,9 +23,24 @@ settings = get_settings()
 REDIS = redis.Redis.from_url(settings.redis_url)
 TICKERS = settings.tickers
 
+logger = logging.getLogger(__name__)
+
 news_service = NewsIngestService()
 
 
+async def _collect_all(from_dt: datetime, to_dt: datetime) -> dict[str, list]:
+    """Collect every ticker on one loop through the staged ingest pipeline.
+
+    A ticker that fails or exceeds its timeout is logged and skipped.
+    """
+
+    try:
+        return await news_service.collect_many(TICKERS, from_dt, to_dt, 1)
+    finally:
+        await news_service.aclose()
+        await close_cache()
+
+
 @celery_app.task(name="hourly_news_ingest")
 def ingest() -> None:
     """Fetch last hour of articles and store/publish."""
@@ -31,8 +48,8 @@ def ingest() -> None:
     to_dt = datetime.utcnow()
     from_dt = to_dt - timedelta(hours=1)
 
-    for ticker in TICKERS:
-        articles = asyncio.run(news_service.collect(ticker, from_dt, to_dt, 1))
+    collected = asyncio.run(_collect_all(from_dt, to_dt))
+    for ticker, articles in collected.items():
         if not articles:
             continue
         payload = {
@@ -2,21 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime, timedelta, timezone
 
 import redis
 
 from moodswing_trading.core.celery_app import celery_app
 from moodswing_trading.core.config import get_settings
 from moodswing_trading.core.logging import setup_logging
-from db import crud, models as db_models
+from db import crud
 from db.models import SessionLocal
-
-def _summarize(headlines: list[str]) -> str:
-    """Return a short summary of headlines (placeholder for LLM)."""
-    text = "; ".join(headlines)
-    return text[:120]
+from services.accumulators import SentimentAccumulators
+from services.aggregation import DayAggregate, aggregate_day, day_score, summarize
+from utils.cache import close_cache
 
 setup_logging()
 settings = get_settings()
@@ -24,6 +24,25 @@ settings = get_settings()
 REDIS = redis.Redis.from_url(settings.redis_url)
 TICKERS = settings.tickers
 
+logger = logging.getLogger(__name__)
+
+
+async def _read(target_date):
+    try:
+        return await SentimentAccumulators().read((t, target_date) for t in TICKERS)
+    finally:
+        await close_cache()
+
+
+def _read_accumulators(target_date) -> dict[str, DayAggregate]:
+    """Today's running aggregates from Redis; empty if unavailable."""
+    try:
+        found = asyncio.run(_read(target_date))
+    except Exception:
+        logger.warning("sentiment accumulators unavailable; using SQL", exc_info=True)
+        return {}
+    return {ticker: agg for (ticker, _), agg in found.items()}
+
 @celery_app.task(name="hourly_sentiment_refresh")
 def refresh() -> None:
     """Update rolling sentiment scores and publish."""
@@ -34,49 +53,57 @@ def refresh() -> None:
     start = datetime.combine(target_date, datetime.min.time())
     end = start + timedelta(days=1)
 
+    # Intra-day runs finalize from the running accumulators; the day-closing
+    # run recomputes from the article table so a final score never depends
+    # on Redis state. Tickers without accumulators fall back to SQL.
+    aggregates: dict[str, DayAggregate] = {}
+    if settings.sentiment_accumulators and not is_final:
+        aggregates = _read_accumulators(target_date)
+    provisional_ts = None if is_final else datetime.now(timezone.utc)
+
     with SessionLocal() as db:
+        if aggregates:
+            # Accumulators missing articles (a failed update whose keys could
+            # not be dropped) disagree with the stored count; use SQL for them
+            counts = crud.count_articles(db, list(aggregates), start, end)
+            aggregates = {
+                t: agg for t, agg in aggregates.items() if agg.article_cnt == counts.get(t)
+            }
+        missing = [t for t in TICKERS if t not in aggregates]
+        if missing:
+            aggregates.update(aggregate_day(db, missing, start, end))
+        # Yesterday's rows for the whole universe in one query
+        yesterday = crud.get_sentiment_days(
+            db, target_date - timedelta(days=1), list(aggregates)
+        )
+        rows = []
         for ticker in TICKERS:
-            rows = (
-                db.query(db_models.Article)
-                .filter(
-                    db_models.Article.ticker == ticker,
-                    db_models.Article.ts_pub >= start,
-                    db_models.Article.ts_pub < end,
-                )
-                .all()
-            )
-            if not rows:
+            agg = aggregates.get(ticker)
+            if agg is None or agg.total_weight == 0:
                 continue
-            total_weight = sum(r.weight or 1.0 for r in rows)
-            if total_weight == 0:
-                continue
-            raw = sum((r.sentiment * (r.weight or 1.0)) for r in rows) / total_weight
-            today_score = round((raw + 1) * 50, 1)
-
             # Blend with yesterday's final score per spec: alpha=0.6
-            yest = crud.get_sentiment_day(db, target_date - timedelta(days=1), ticker)
-            if yest and yest.is_final:
-                score = round(0.6 * today_score + 0.4 * yest.score, 1)
-            else:
-                score = today_score
-
-            top_rows = sorted(rows, key=lambda r: r.weight or 1.0, reverse=True)[:5]
-            explanation = _summarize([r.headline for r in top_rows])
-            rec = crud.upsert_sentiment_day(
-                db,
-                target_date,
-                ticker,
-                score,
-                len(rows),
-                explanation=explanation,
-                is_final=is_final,
+            rows.append(
+                {
+                    "dt": target_date,
+                    "ticker": ticker,
+                    "score": day_score(agg, yesterday.get(ticker)),
+                    "article_cnt": agg.article_cnt,
+                    "explanation": summarize(agg.top_headlines),
+                    "is_final": is_final,
+                    "provisional_ts": provisional_ts,
+                }
             )
+        crud.upsert_sentiment_days(db, rows)
+
+    with REDIS.pipeline(transaction=False) as pipe:
+        for row in rows:
             payload = {
-                "ticker": ticker,
+                "ticker": row["ticker"],
                 "date": target_date.isoformat(),
-                "score": rec.score,
-                "article_cnt": rec.article_cnt,
-                "is_final": rec.is_final,
-                "explanation": rec.explanation,
+                "score": row["score"],
+                "article_cnt": row["article_cnt"],
+                "is_final": row["is_final"],
+                "explanation": row["explanation"],
             }
-            REDIS.publish("sentiment_day", json.dumps(payload))
\ No newline at end of file
+            pipe.publish("sentiment_day", json.dumps(payload))
+        pipe.execute()
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""Asyncio micro-batching helper.
+
+Concurrent callers submit single items; a background task drains them into
+batches bounded by size and wait time and resolves each caller's future with
+its own result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Merge concurrent ``submit`` calls into calls of ``fn`` on lists.
+
+    ``fn`` must return one result per input, in input order. The batcher is
+    bound to the event loop it was created on.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Awaitable[Sequence[R]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[Tuple[T, asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    async def submit(self, item: T) -> R:
+        """Queue ``item`` and wait for its result."""
+        fut = self.loop.create_future()
+        self._queue.put_nowait((item, fut))
+        if self._worker is None or self._worker.done():
+            self._worker = self.loop.create_task(self._run())
+        return await fut
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+        batch = [self._queue.get_nowait()]
+        deadline = self.loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self.loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        # Exit once drained; the next submit() starts a fresh worker.
+        while not self._queue.empty():
+            batch = await self._collect()
+            pending = [(item, fut) for item, fut in batch if not fut.done()]
+            if not pending:
+                continue
+            try:
+                results = await self.fn([item for item, _ in pending])
+            except Exception as exc:
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, fut), res in zip(pending, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+
+__all__ = ["MicroBatcher"]
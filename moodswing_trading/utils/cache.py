@@ -1,13 +1,13 @@
 """Simple Redis JSON cache helpers with TTL.
 
 Usage:
-    from utils.cache import get_cache, get_json, set_json
+    from utils.cache import close_cache, get_cache, get_json, set_json
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
-from functools import lru_cache
 from typing import Any, Optional
 
 import redis.asyncio as redis
@@ -15,10 +15,27 @@ import redis.asyncio as redis
 from core.config import get_settings
 
 
-@lru_cache()
+# Async connections are bound to the loop that opened them; Celery tasks run
+# a fresh loop per invocation, so keep one client per running loop. Callers
+# that own a short-lived loop must :func:`close_cache` before it ends.
+_clients: "dict[asyncio.AbstractEventLoop, redis.Redis]" = {}
+
+
 def get_cache() -> redis.Redis:
     settings = get_settings()
-    return redis.from_url(settings.redis_url)
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.from_url(settings.redis_url)
+        _clients[loop] = client
+    return client
+
+
+async def close_cache() -> None:
+    """Close the running loop's client, if one was opened."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
 
 async def get_json(key: str) -> Optional[Any]:
@@ -0,0 +1,36 @@
+"""Redis-backed cache of parsed RSS feeds and their HTTP validators.
+
+Entries are keyed by feed URL and hold the ``ETag``/``Last-Modified`` values
+from the last 200 response together with the parsed ``feed`` and ``entries``,
+so a ``304 Not Modified`` can be answered from the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional
+
+from core.config import get_settings
+
+from .cache import get_json, set_json
+
+
+class FeedCache:
+    """Store conditional-GET validators and the parse they belong to."""
+
+    def __init__(self, ttl_seconds: int | None = None) -> None:
+        settings = get_settings()
+        self.ttl_seconds = ttl_seconds or settings.news_feed_cache_ttl_seconds
+
+    @staticmethod
+    def key(url: str) -> str:
+        return "feed:" + hashlib.sha1(url.encode()).hexdigest()
+
+    async def get(self, url: str) -> Optional[dict[str, Any]]:
+        return await get_json(self.key(url))
+
+    async def set(self, url: str, value: dict[str, Any]) -> None:
+        await set_json(self.key(url), value, self.ttl_seconds)
+
+
+__all__ = ["FeedCache"]
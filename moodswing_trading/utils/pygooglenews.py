@@ -1,33 +1,53 @@
+import asyncio
+import weakref
+
 import feedparser
-from bs4 import BeautifulSoup
+import httpx
+from lxml import html as lxml_html
 import urllib
-from dateparser import parse as parse_date
 import requests
 
+from .timeparse import parse_datetime
+
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
 
 class GoogleNews:
-    def __init__(self, lang = 'en', country = 'US'):
+    def __init__(self, lang = 'en', country = 'US', timeout = 10.0, retries = 2,
+                 backoff = 0.5, max_connections = 20, feed_cache = None,
+                 parse_sub_articles = True):
         self.lang = lang.lower()
         self.country = country.upper()
         self.BASE_URL = 'https://news.google.com/rss'
+        # Async transport: one pooled keep-alive client per event loop
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self._clients = weakref.WeakKeyDictionary()
+        # Optional async store with get(url)/set(url, value) for conditional GETs
+        self.feed_cache = feed_cache
+        # Set False to skip extracting 'sub_articles' from entry summaries
+        self.parse_sub_articles = parse_sub_articles
 
     def __top_news_parser(self, text):
         """Return subarticles from the main and topic feeds"""
+        if not text.strip():
+            return []
         try:
-            bs4_html = BeautifulSoup(text, "html.parser")
-            # find all li tags
-            lis = bs4_html.find_all('li')
+            root = lxml_html.fragment_fromstring(text, create_parent='div')
             sub_articles = []
-            for li in lis:
-                try:
-                    sub_articles.append({"url": li.a['href'],
-                                         "title": li.a.text,
-                                         "publisher": li.font.text})
-                except:
-                    pass
+            for li in root.iter('li'):
+                a = li.find('.//a')
+                font = li.find('.//font')
+                if a is None or font is None or a.get('href') is None:
+                    continue
+                sub_articles.append({"url": a.get('href'),
+                                     "title": a.text_content(),
+                                     "publisher": font.text_content()})
             return sub_articles
-        except:
+        except Exception:
             return text
 
     def __ceid(self):
@@ -35,6 +55,8 @@ class GoogleNews:
         return '?ceid={}:{}&hl={}&gl={}'.format(self.country,self.lang,self.lang,self.country)
 
     def __add_sub_articles(self, entries):
+        if not self.parse_sub_articles:
+            return entries
         for i, val in enumerate(entries):
             if 'summary' in entries[i].keys():
                 entries[i]['sub_articles'] = self.__top_news_parser(entries[i]['summary'])
@@ -61,16 +83,12 @@ class GoogleNews:
         if scraping_bee and proxies:
             raise Exception("Pick either ScrapingBee or proxies. Not both!")
 
-        if proxies:
-            r = requests.get(feed_url, proxies = proxies)
-        else:
-            r = requests.get(feed_url)
-
         if scraping_bee:
             r = self.__scaping_bee_request(url = feed_url, api_key = scraping_bee)
+        elif proxies:
+            r = requests.get(feed_url, proxies = proxies, timeout = self.timeout)
         else:
-            r = requests.get(feed_url)
-
+            r = requests.get(feed_url, timeout = self.timeout)
 
         if 'https://news.google.com/rss/unsupported' in r.url:
             raise Exception('This feed is not available')
@@ -82,12 +100,71 @@ class GoogleNews:
 
         return dict((k, d[k]) for k in ('feed', 'entries'))
 
+    def __client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def __aget(self, feed_url, headers=None):
+        """GET ``feed_url`` once, retrying transport errors and 429/5xx with backoff"""
+        client = self.__client()
+        for attempt in range(self.retries + 1):
+            try:
+                r = await client.get(feed_url, headers=headers)
+                if r.status_code == 304:
+                    return r
+                if r.status_code not in RETRY_STATUS or attempt == self.retries:
+                    r.raise_for_status()
+                    return r
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def __aparse_feed(self, feed_url):
+        cached = await self.feed_cache.get(feed_url) if self.feed_cache else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        r = await self.__aget(feed_url, headers=headers)
+        if r.status_code == 304 and cached:
+            return {'feed': cached['feed'], 'entries': cached['entries']}
+        if 'https://news.google.com/rss/unsupported' in str(r.url):
+            raise Exception('This feed is not available')
+        # Parsing is CPU-bound; keep it off the event loop
+        d = await asyncio.to_thread(feedparser.parse, r.text)
+        d = dict((k, d[k]) for k in ('feed', 'entries'))
+
+        etag = r.headers.get('ETag')
+        last_modified = r.headers.get('Last-Modified')
+        if self.feed_cache and (etag or last_modified):
+            await self.feed_cache.set(feed_url, {'etag': etag, 'last_modified': last_modified, **d})
+        return d
+
+    async def aclose(self):
+        """Close the pooled client bound to the running loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
     def __search_helper(self, query):
         return urllib.parse.quote_plus(query)
 
     def __from_to_helper(self, validate=None):
         try:
-            validate = parse_date(validate).strftime('%Y-%m-%d')
+            validate = parse_datetime(validate).strftime('%Y-%m-%d')
             return str(validate)
         except:
             raise Exception('Could not parse your date')
@@ -125,15 +202,7 @@ class GoogleNews:
         d['entries'] = self.__add_sub_articles(d['entries'])
         return d
 
-    def search(self, query: str, helper = True, when = None, from_ = None, to_ = None, proxies=None, scraping_bee=None):
-        """
-        Return a list of all articles given a full-text search parameter,
-        a country and a language
-
-        :param bool helper: When True helps with URL quoting
-        :param str when: Sets a time range for the artiles that can be found
-        """
-
+    def __search_url(self, query, helper = True, when = None, from_ = None, to_ = None):
         if when:
             query += ' when:' + when
 
@@ -151,7 +220,29 @@ class GoogleNews:
         search_ceid = self.__ceid()
         search_ceid = search_ceid.replace('?', '&')
 
-        d = self.__parse_feed(self.BASE_URL + '/search?q={}'.format(query) + search_ceid, proxies = proxies, scraping_bee=scraping_bee)
+        return self.BASE_URL + '/search?q={}'.format(query) + search_ceid
+
+    def search(self, query: str, helper = True, when = None, from_ = None, to_ = None, proxies=None, scraping_bee=None):
+        """
+        Return a list of all articles given a full-text search parameter,
+        a country and a language
+
+        :param bool helper: When True helps with URL quoting
+        :param str when: Sets a time range for the artiles that can be found
+        """
+
+        d = self.__parse_feed(self.__search_url(query, helper, when, from_, to_), proxies = proxies, scraping_bee=scraping_bee)
 
         d['entries'] = self.__add_sub_articles(d['entries'])
-        return d
\ No newline at end of file
+        return d
+
+    async def asearch(self, query: str, helper = True, when = None, from_ = None, to_ = None):
+        """
+        Async ``search`` over the pooled keep-alive client: exactly one
+        HTTP request per feed, retried with backoff on transient failures
+        """
+
+        d = await self.__aparse_feed(self.__search_url(query, helper, when, from_, to_))
+
+        d['entries'] = await asyncio.to_thread(self.__add_sub_articles, d['entries'])
+        return d
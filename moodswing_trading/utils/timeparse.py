@@ -0,0 +1,75 @@
+"""Timestamp parsing for feed entries with a strict fast path.
+
+RSS ``pubDate`` values are almost always RFC 822 and feedparser already
+decodes them into ``published_parsed``; dateparser is only consulted for the
+odd string neither strict parser accepts.
+"""
+
+from __future__ import annotations
+
+import calendar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+from dateparser import parse as parse_date
+from prometheus_client import Counter
+
+TIMESTAMP_PARSES = Counter(
+    "news_timestamp_parse_total",
+    "Feed timestamps parsed, by parser path",
+    ["path"],
+)
+
+
+def _aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+def _strict(value: str) -> Optional[datetime]:
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_datetime(value: str | None) -> Optional[datetime]:
+    """Parse ``value`` as RFC 822 or ISO 8601, falling back to dateparser.
+
+    Returns a timezone-aware datetime (naive input is taken as UTC) or
+    ``None`` when nothing can parse it.
+    """
+    if not value:
+        return None
+    ts = _strict(value)
+    if ts is not None:
+        TIMESTAMP_PARSES.labels("fast").inc()
+        return _aware(ts)
+    ts = parse_date(value)
+    TIMESTAMP_PARSES.labels("fallback" if ts is not None else "failed").inc()
+    return _aware(ts) if ts is not None else None
+
+
+def parse_published(entry: Mapping[str, Any]) -> Optional[datetime]:
+    """Return the publication time of a feedparser entry in UTC.
+
+    ``published_parsed`` is a UTC ``struct_time``, or a plain list once the
+    entry has been round-tripped through the JSON feed cache.
+    """
+    parsed = entry.get("published_parsed")
+    if parsed:
+        try:
+            ts = datetime.fromtimestamp(calendar.timegm(tuple(parsed)[:9]), timezone.utc)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        else:
+            TIMESTAMP_PARSES.labels("fast").inc()
+            return ts
+    return parse_datetime(entry.get("published"))
+
+
+__all__ = ["parse_datetime", "parse_published"]
@@ -0,0 +1,253 @@
+"""Rebuild ``sentiment_day`` for a date range from stored articles.
+
+Articles are streamed from the database in chunks and each chunk is reduced
+with pandas to one row per ``(ticker, day, cluster)``, keeping the heaviest
+copy of every near-duplicate cluster exactly as
+:func:`services.aggregation.aggregate_day` does. Daily weighted scores are
+then computed per ticker-day and chained through the day-over-day blend, and
+the results are bulk-written with ``crud.upsert_sentiment_days``.
+
+Work is split into batches of tickers that run in separate processes; each
+batch reads and writes only its own tickers. Every day before today is
+written as final; today, if in range, stays provisional.
+
+Articles store their publisher rank as ``weight``; recency decay with
+``DECAY_TAU`` is applied here, measuring each article's age at the close of
+its day (or now, for today), as the hourly refresh does. ``--reweight``
+re-derives ranks from the current ``PUBLISHER_RANK`` instead of using the
+stored ones.
+
+Usage:
+    python scripts/backfill_sentiment.py --start 2025-01-01 [--end 2025-06-30] \\
+        [--tickers AAPL,MSFT] [--workers 4] [--reweight] [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT.parent / "moodswing_trading"))
+
+from sqlalchemy import select  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from db import crud  # noqa: E402
+from db.models import Article, SessionLocal  # noqa: E402
+from services.aggregation import (  # noqa: E402
+    BLEND_ALPHA,
+    DECAY_TAU,
+    DEFAULT_RANK,
+    PUBLISHER_RANK,
+    TOP_K,
+    blend,
+    mood_score,
+    summarize,
+)
+
+COLUMNS = ["ticker", "id", "headline", "ts_pub", "sentiment", "weight", "cluster_id", "provider"]
+CLUSTER_KEY = ["ticker", "day", "cluster"]
+DAY_KEY = ["ticker", "day"]
+
+
+def prepare(chunk: pd.DataFrame, reweight: bool, now: pd.Timestamp) -> pd.DataFrame:
+    """Add the UTC ``day``, ``cluster`` key and decayed weight ``w``."""
+    ts = pd.to_datetime(chunk["ts_pub"], utc=True).dt.tz_localize(None)
+    day = ts.dt.floor("D")
+    if reweight:
+        rank = chunk["provider"].map(PUBLISHER_RANK).fillna(DEFAULT_RANK)
+    else:
+        rank = chunk["weight"].astype(float)
+    # A missing or zero rank counts as 1, as in aggregate_day
+    rank = rank.where(rank.fillna(0) != 0, 1.0)
+    close = np.minimum(day + pd.Timedelta(days=1), now)
+    age_hours = (close - ts) / pd.Timedelta(hours=1)
+    w = rank * np.exp(-age_hours / DECAY_TAU)
+    return pd.DataFrame(
+        {
+            "ticker": chunk["ticker"],
+            "day": day,
+            "cluster": chunk["cluster_id"].fillna(chunk["id"]),
+            "id": chunk["id"],
+            "headline": chunk["headline"],
+            "sentiment": chunk["sentiment"].astype(float),
+            "w": w,
+            "n": 1,
+        }
+    )
+
+
+def reduce_clusters(frame: pd.DataFrame) -> pd.DataFrame:
+    """Keep each cluster's heaviest row (lowest id on ties), counting all rows.
+
+    The reduction is associative, so per-chunk results can be concatenated
+    and reduced again.
+    """
+    frame = frame.sort_values(["w", "id"], ascending=[False, True], kind="stable")
+    n = frame.groupby(CLUSTER_KEY, sort=False)["n"].transform("sum")
+    return frame.assign(n=n).drop_duplicates(CLUSTER_KEY)
+
+
+def load_clusters(
+    db, tickers: list[str], start: date, end: date, chunk_size: int, reweight: bool
+) -> pd.DataFrame:
+    """Stream articles published from ``start`` through ``end`` for ``tickers``."""
+    now = pd.Timestamp(datetime.now(timezone.utc).replace(tzinfo=None))
+    stmt = (
+        select(*(getattr(Article, c) for c in COLUMNS))
+        .where(
+            Article.ticker.in_(tickers),
+            Article.ts_pub >= datetime.combine(start, datetime.min.time()),
+            Article.ts_pub < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+    parts = [
+        reduce_clusters(prepare(pd.DataFrame(rows, columns=COLUMNS), reweight, now))
+        for rows in db.execute(stmt).partitions()
+    ]
+    if not parts:
+        return pd.DataFrame(columns=[*CLUSTER_KEY, "id", "headline", "sentiment", "w", "n"])
+    return reduce_clusters(pd.concat(parts, ignore_index=True))
+
+
+def daily_aggregates(clusters: pd.DataFrame, top_k: int) -> pd.DataFrame:
+    """Weighted sums, article counts and top headlines per ticker-day."""
+    clusters = clusters.assign(sw=clusters["sentiment"] * clusters["w"])
+    days = clusters.groupby(DAY_KEY).agg(
+        weighted_sum=("sw", "sum"),
+        total_weight=("w", "sum"),
+        article_cnt=("n", "sum"),
+    )
+    # reduce_clusters left rows sorted by weight, so head() takes the top K
+    top = clusters.groupby(DAY_KEY, sort=False).head(top_k)
+    days["headlines"] = top.groupby(DAY_KEY, sort=False)["headline"].agg(list)
+    days = days[days["total_weight"] > 0]
+    days["raw"] = days["weighted_sum"] / days["total_weight"]
+    return days.sort_index()
+
+
+def chain_scores(
+    days: pd.DataFrame, seeds: dict, alpha: float, today: date
+) -> list[dict]:
+    """Blend each day with the previous day's score, as the hourly refresh does.
+
+    A day blends only when the previous calendar day has a final score:
+    either computed here or, for the first day, already stored (``seeds``).
+    Scores are rounded at every step so the chain matches the live path.
+    """
+    rows: list[dict] = []
+    now = datetime.now(timezone.utc)
+    for ticker, frame in days.groupby(level="ticker", sort=False):
+        seed = seeds.get(ticker)
+        prev = (None, None)
+        if seed is not None and seed.is_final:
+            prev = (seed.dt, seed.score)
+        for (_, day), rec in frame.iterrows():
+            dt = day.date()
+            score = mood_score(rec["raw"])
+            if prev[0] == dt - timedelta(days=1):
+                score = blend(score, prev[1], alpha)
+            is_final = dt < today
+            rows.append(
+                {
+                    "dt": dt,
+                    "ticker": ticker,
+                    "score": score,
+                    "article_cnt": int(rec["article_cnt"]),
+                    "explanation": summarize(rec["headlines"]),
+                    "is_final": is_final,
+                    "provisional_ts": None if is_final else now,
+                }
+            )
+            prev = (dt, score) if is_final else (None, None)
+    return rows
+
+
+def backfill_tickers(
+    tickers: list[str],
+    start: date,
+    end: date,
+    chunk_size: int,
+    reweight: bool,
+    alpha: float,
+    top_k: int,
+    dry_run: bool,
+) -> int:
+    """Recompute and store ``tickers``' daily scores; returns rows written."""
+    today = datetime.now(timezone.utc).date()
+    with SessionLocal() as db:
+        clusters = load_clusters(db, tickers, start, end, chunk_size, reweight)
+        if clusters.empty:
+            return 0
+        seeds = crud.get_sentiment_days(db, start - timedelta(days=1), tickers)
+        rows = chain_scores(daily_aggregates(clusters, top_k), seeds, alpha, today)
+        if not dry_run:
+            crud.upsert_sentiment_days(db, rows)
+    return len(rows)
+
+
+def main() -> int:
+    settings = get_settings()
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, default=yesterday, help="inclusive")
+    parser.add_argument("--tickers", default=",".join(settings.tickers))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=25, help="tickers per worker task")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="articles per fetch")
+    parser.add_argument("--alpha", type=float, default=BLEND_ALPHA)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--reweight", action="store_true", help="recompute article weights")
+    parser.add_argument("--dry-run", action="store_true", help="compute without writing")
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("--end is before --start")
+    tickers = sorted({t.strip().upper() for t in args.tickers.split(",") if t.strip()})
+    batches = [tickers[i : i + args.batch] for i in range(0, len(tickers), args.batch)]
+    params = (
+        args.start,
+        args.end,
+        args.chunk_size,
+        args.reweight,
+        args.alpha,
+        args.top_k,
+        args.dry_run,
+    )
+
+    started = time.perf_counter()
+    if args.workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=mp.get_context("spawn")
+        ) as pool:
+            written = sum(pool.map(backfill_tickers, batches, *([p] * len(batches) for p in params)))
+    else:
+        written = sum(backfill_tickers(batch, *params) for batch in batches)
+
+    report = {
+        "start": args.start.isoformat(),
+        "end": args.end.isoformat(),
+        "tickers": len(tickers),
+        "days_written": 0 if args.dry_run else written,
+        "days_computed": written,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
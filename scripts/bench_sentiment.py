@@ -0,0 +1,172 @@
+"""Offline throughput/latency benchmark for sentiment inference backends.
+
+Runs the bundled headline corpus through each backend at each batch size and
+prints a JSON report (latency percentiles, headlines/sec, peak RSS, model
+load time). Every backend runs in its own process so load time and RSS are
+not shared between them.
+
+The benchmark never touches the network: Hugging Face is forced offline, so
+``--model`` must already be in the local cache or be a local directory. A
+tiny stand-in such as
+``hf-internal-testing/tiny-random-DebertaV2ForSequenceClassification`` is
+enough to compare commits when the production model is not cached.
+
+Usage:
+    python scripts/bench_sentiment.py --backends torch,onnx --batch-sizes 1,8,32,64
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue as queue_module
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT.parent / "moodswing_trading"))
+# Never download models; children inherit this
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+DEFAULT_CORPUS = ROOT / "fixtures" / "finance_headlines.txt"
+
+
+def load_corpus(path: Path, min_headlines: int) -> list[str]:
+    lines = [line.strip() for line in path.read_text(encoding="utf-8").splitlines()]
+    lines = [line for line in lines if line]
+    corpus = list(lines)
+    while len(corpus) < min_headlines:
+        corpus.extend(lines)
+    return corpus[: max(min_headlines, len(lines))]
+
+
+def percentile(values: list[float], q: float) -> float:
+    import numpy as np
+
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_backend(name: str, model: str, corpus: list[str], batch_sizes: list[int], warmup: int) -> dict:
+    """Load one backend and time it at every batch size (runs in a child process)."""
+    from services.sentiment_backends import load_backend
+
+    started = time.perf_counter()
+    backend = load_backend(name, model)
+    report: dict = {"backend": name, "load_seconds": round(time.perf_counter() - started, 3)}
+
+    runs = []
+    for size in batch_sizes:
+        batches = [corpus[i : i + size] for i in range(0, len(corpus), size)]
+        for batch in batches[:warmup]:
+            backend.predict(batch)
+        latencies = []
+        begin = time.perf_counter()
+        for batch in batches:
+            t0 = time.perf_counter()
+            backend.predict(batch)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - begin
+        runs.append(
+            {
+                "batch_size": size,
+                "batches": len(batches),
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50), 3),
+                    "p95": round(percentile(latencies, 95), 3),
+                    "p99": round(percentile(latencies, 99), 3),
+                },
+                "headlines_per_sec": round(len(corpus) / elapsed, 2) if elapsed else 0.0,
+            }
+        )
+    report["runs"] = runs
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return report
+
+
+def _child(queue, *args) -> None:
+    try:
+        queue.put(run_backend(*args))
+    except Exception as exc:
+        queue.put({"backend": args[0], "error": f"{type(exc).__name__}: {exc}"})
+
+
+def _collect(queue, proc, name: str, poll: float = 5.0) -> dict:
+    """Read the child's report before joining it.
+
+    A child blocks on exit until its queued report is read, so joining first
+    deadlocks on reports larger than the pipe buffer.
+    """
+    while True:
+        try:
+            report = queue.get(timeout=poll)
+            break
+        except queue_module.Empty:
+            if proc.is_alive():
+                continue
+            try:
+                report = queue.get(timeout=poll)
+            except queue_module.Empty:
+                report = {"backend": name, "error": f"benchmark process exited with {proc.exitcode}"}
+            break
+    proc.join()
+    return report
+
+
+def git_sha() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def main() -> int:
+    from services.sentiment_backends import DEFAULT_MODEL
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_BENCH_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--backends", default="torch,onnx")
+    parser.add_argument("--batch-sizes", default="1,8,32,64")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--min-headlines", type=int, default=512)
+    parser.add_argument("--warmup", type=int, default=2, help="warm-up batches per batch size")
+    parser.add_argument("--output", type=Path, help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.min_headlines)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+    ctx = mp.get_context("spawn")
+
+    results = []
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        queue = ctx.Queue()
+        proc = ctx.Process(
+            target=_child, args=(queue, name, args.model, corpus, batch_sizes, args.warmup)
+        )
+        proc.start()
+        results.append(_collect(queue, proc, name))
+
+    report = {
+        "git_sha": git_sha(),
+        "model": args.model,
+        "headlines": len(corpus),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
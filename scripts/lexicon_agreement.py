@@ -0,0 +1,81 @@
+"""Check how often the lexicon tier agrees with the transformer it bypasses.
+
+For each candidate ``SENTIMENT_LEXICON_THRESHOLD`` the report gives the share
+of headlines the lexicon settles and how often those labels match the
+transformer's, then names the lowest threshold meeting ``--min-agreement``.
+
+Usage:
+    python scripts/lexicon_agreement.py [--fixture PATH] [--backend torch] \\
+        [--thresholds 0.5,0.6,0.7,0.75] [--min-agreement 0.95]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT.parent / "moodswing_trading"))
+
+from services.lexicon import LexiconScorer  # noqa: E402
+from services.sentiment_backends import DEFAULT_MODEL, load_backend  # noqa: E402
+
+DEFAULT_FIXTURE = ROOT / "fixtures" / "finance_headlines.txt"
+
+
+def load_fixture(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--backend", default="torch", help="reference backend")
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.75")
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    texts = load_fixture(args.fixture)
+    thresholds = sorted(float(t) for t in args.thresholds.split(",") if t.strip())
+    if not texts or not thresholds:
+        parser.error("need headlines and at least one threshold")
+
+    reference = load_backend(args.backend, args.model)
+    want: list[int] = []
+    for i in range(0, len(texts), args.batch_size):
+        want.extend(reference.predict(texts[i : i + args.batch_size]))
+    got, confidence = LexiconScorer().score(texts)
+
+    for text, w, g, c in zip(texts, want, got, confidence):
+        if c >= thresholds[0] and w != g:
+            print(
+                f"MISMATCH conf={c:.2f} {args.backend}={w:+d} lexicon={g:+d}  {text}",
+                file=sys.stderr,
+            )
+
+    passing = None
+    for threshold in thresholds:
+        settled = [i for i, c in enumerate(confidence) if c >= threshold]
+        agreed = sum(want[i] == got[i] for i in settled)
+        agreement = agreed / len(settled) if settled else 1.0
+        print(
+            f"threshold {threshold:g}: lexicon settles {len(settled) / len(texts):.3f} "
+            f"of {len(texts)} headlines, {agreement:.3f} agreement"
+        )
+        if passing is None and settled and agreement >= args.min_agreement:
+            passing = threshold
+
+    if passing is None:
+        print(f"No threshold reaches {args.min_agreement:.3f} agreement", file=sys.stderr)
+        return 1
+    print(f"Lowest threshold with {args.min_agreement:.3f} agreement: {passing:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Check that the ONNX sentiment backend agrees with the PyTorch pipeline.
+
+Usage:
+    python scripts/sentiment_parity.py [--fixture PATH] [--min-agreement 0.95]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT.parent / "moodswing_trading"))
+
+from services.sentiment_backends import DEFAULT_MODEL, load_backend  # noqa: E402
+
+DEFAULT_FIXTURE = ROOT / "fixtures" / "finance_headlines.txt"
+
+
+def load_fixture(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    texts = load_fixture(args.fixture)
+    reference = load_backend("torch", args.model)
+    candidate = load_backend("onnx", args.model)
+
+    mismatches = []
+    for i in range(0, len(texts), args.batch_size):
+        chunk = texts[i : i + args.batch_size]
+        for text, want, got in zip(chunk, reference.predict(chunk), candidate.predict(chunk)):
+            if want != got:
+                mismatches.append((text, want, got))
+
+    agreement = 1 - len(mismatches) / len(texts) if texts else 1.0
+    for text, want, got in mismatches:
+        print(f"MISMATCH torch={want:+d} onnx={got:+d}  {text}", file=sys.stderr)
+    print(f"Sentiment parity: {agreement:.3f} agreement over {len(texts)} headlines")
+    if agreement < args.min_agreement:
+        print(f"Agreement below {args.min_agreement:.3f}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())